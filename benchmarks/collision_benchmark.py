@@ -0,0 +1,59 @@
+import os
+import sys
+import random
+import timeit
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import pygame
+from utils.spatial_hash import SpatialHash
+
+WORLD_SIZE = 4000
+MOVES = 2000
+
+def make_walls(count, seed=1):
+    rng = random.Random(seed)
+    walls = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            walls.append(pygame.Rect(rng.randrange(WORLD_SIZE), rng.randrange(WORLD_SIZE), rng.randint(40, 200), 20))
+        else:
+            walls.append(pygame.Rect(rng.randrange(WORLD_SIZE), rng.randrange(WORLD_SIZE), 20, rng.randint(40, 200)))
+    return walls
+
+def linear_move(rect, dx, dy, walls):
+    # The original Player/AI move: snap back on any contact
+    original_x = rect.x
+    original_y = rect.y
+    rect.x += dx
+    rect.y += dy
+    for wall in walls:
+        if rect.colliderect(wall):
+            rect.x = original_x
+            rect.y = original_y
+            break
+
+def run(count):
+    walls = make_walls(count)
+    index = SpatialHash(walls)
+    rng = random.Random(2)
+    starts = [pygame.Rect(rng.randrange(WORLD_SIZE), rng.randrange(WORLD_SIZE), 20, 20) for _ in range(MOVES)]
+    steps = [(rng.choice((-6, 0, 6)), rng.choice((-6, 0, 6))) for _ in range(MOVES)]
+
+    def linear():
+        for rect, (dx, dy) in zip(starts, steps):
+            linear_move(rect.copy(), dx, dy, walls)
+
+    def hashed():
+        for rect, (dx, dy) in zip(starts, steps):
+            index.move(rect.copy(), dx, dy)
+
+    linear_time = min(timeit.repeat(linear, number=1, repeat=5)) / MOVES
+    hashed_time = min(timeit.repeat(hashed, number=1, repeat=5)) / MOVES
+    print(f"{count:>6} walls | linear {linear_time * 1e6:9.2f} us/move | "
+          f"spatial hash {hashed_time * 1e6:7.2f} us/move | x{linear_time / hashed_time:.1f}")
+
+if __name__ == "__main__":
+    for count in (10, 1000, 10000):
+        run(count)
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+from headless import init_headless
+
+import pygame
+from display import Display
+
+WINDOW_SIZES = [(800, 600), (1920, 1080), (2560, 1440), (3840, 2160)]
+TIERS = ['low', 'medium', 'high']
+FRAMES = 60
+# A typical dirty frame: a board cell or two and the HUD line
+DIRTY = [pygame.Rect(325, 225, 150, 150), pygame.Rect(10, 10, 300, 40)]
+
+def bench_present(display, rects):
+    display.framebuffer.fill((20, 40, 60))
+    display.present()  # Pushes the letterbox once, like the first frame
+    times = []
+    for frame in range(FRAMES):
+        display.framebuffer.fill((frame * 4 % 256, 80, 120), DIRTY[0])
+        begin = time.perf_counter()
+        display.present(rects)
+        times.append((time.perf_counter() - begin) * 1000)
+    times.sort()
+    return times[len(times) // 2]
+
+def main():
+    init_headless()
+    print(f"{'tier':<8}{'window':<12}{'scale':>7}{'full ms':>10}{'dirty ms':>10}")
+    for tier in TIERS:
+        for size in WINDOW_SIZES:
+            display = Display(tier=tier, window_size=size)
+            full = bench_present(display, None)
+            dirty = bench_present(display, DIRTY)
+            scale = display.scale if isinstance(display.scale, int) else f"{display.scale:.2f}"
+            print(f"{tier:<8}{f'{size[0]}x{size[1]}':<12}{scale:>7}{full:>10.3f}{dirty:>10.3f}")
+
+if __name__ == "__main__":
+    main()
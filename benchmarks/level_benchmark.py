@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+from headless import HeadlessSession, FirewallBot, CircuitBot, ChaseBot, init_headless
+
+import pygame
+from config import *
+import snapshot
+from ui_elements import Terminal
+from sound_manager import SoundManager
+from levels.firewall_breach import FirewallBreach
+from levels.encrypted_room import EncryptedRoom
+from levels.ai_showdown import AIShowdown
+
+# name, level class, bot, level options
+LEVEL_CASES = [
+    ('firewall', FirewallBreach, FirewallBot, {}),
+] + [
+    (f'circuit/grid{size}', EncryptedRoom, CircuitBot, {'grid_size': size}) for size in (4, 8, 16, 32, 64)
+] + [
+    ('showdown/classic', AIShowdown, ChaseBot, {}),
+    ('showdown/maze20-ai8', AIShowdown, ChaseBot, {'maze_size': (20, 20), 'ai_count': 8}),
+    ('showdown/maze60-ai64', AIShowdown, ChaseBot, {'maze_size': (60, 60), 'ai_count': 64}),
+    ('showdown/maze100-ai512', AIShowdown, ChaseBot, {'maze_size': (100, 100), 'ai_count': 512}),
+]
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'samples': len(ordered)}
+
+def bench_level(level_class, bot_class, options, frames, warmup):
+    screen = pygame.display.get_surface()
+    sound_manager = SoundManager(muted=True)
+
+    def start():
+        session = HeadlessSession(level_class, seed=0, sound_manager=sound_manager, **options)
+        session.bot = bot_class()
+        while session.level.show_instructions:
+            session.step(session.bot(session))
+        return session
+
+    session = start()
+    updates, draws, saves = [], [], []
+    for frame in range(warmup + frames):
+        if session.finished():
+            session = start()  # Keep measuring live gameplay, the restart is not timed
+        events = session.bot(session)
+        begin = time.perf_counter()
+        session.step(events)
+        middle = time.perf_counter()
+        session.level.draw(screen)
+        end = time.perf_counter()
+        session.level.get_dirty_rects()
+        snapshot.dump(session.game_state, session.clock, session.level)
+        saved = time.perf_counter()
+        if frame >= warmup:
+            updates.append(middle - begin)
+            draws.append(end - middle)
+            saves.append(saved - end)
+    return {'update': percentiles(updates), 'draw': percentiles(draws), 'snapshot': percentiles(saves)}
+
+def bench_terminal(frames, chatty=False):
+    # Full scrollback, then either steady frames or one new message and a scroll step per frame
+    screen = pygame.display.get_surface()
+    terminal = Terminal(10, WINDOW_HEIGHT - 150, WINDOW_WIDTH - 20, 140)
+    for i in range(TERMINAL_SCROLLBACK // 2 + 10):
+        terminal.add_message(f">> Message {i}: " + "intrusion countermeasures engaged " * 2)
+    terminal.draw(screen)
+    samples = []
+    for i in range(frames):
+        begin = time.perf_counter()
+        if chatty:
+            terminal.add_message(f">> Alert {i}: " + "intrusion countermeasures engaged " * 2)
+            terminal.scroll(1 if i % 2 else -1)
+        terminal.draw(screen)
+        samples.append(time.perf_counter() - begin)
+    return {'draw': percentiles(samples)}
+
+def bench_sound_startup(repeats):
+    samples = []
+    for _ in range(repeats):
+        begin = time.perf_counter()
+        SoundManager(cache_dir=None).wait()
+        samples.append(time.perf_counter() - begin)
+    return {'startup': percentiles(samples)}
+
+def compare(results, baseline, threshold):
+    # A case regresses when its p50 or p95 exceeds the baseline by more than threshold (a fraction)
+    regressions = []
+    for case, phases in results.items():
+        for phase, stats in phases.items():
+            before = baseline.get(case, {}).get(phase)
+            if not before:
+                continue
+            for key in ('p50', 'p95'):
+                if before[key] > 0 and stats[key] > before[key] * (1 + threshold):
+                    regressions.append(f"{case} {phase} {key}: {before[key]:.3f} -> {stats[key]:.3f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless per-frame benchmarks for every level")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=30)
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this text")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="JSON from an earlier --output run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown before failing, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    init_headless()
+    pygame.mixer.init()
+    random.seed(0)
+
+    cases = [(name, lambda case=(level_class, bot_class, options): bench_level(*case, args.frames, args.warmup))
+             for name, level_class, bot_class, options in LEVEL_CASES]
+    cases.append(('terminal/full', lambda: bench_terminal(args.frames)))
+    cases.append(('terminal/chatty', lambda: bench_terminal(args.frames, chatty=True)))
+    cases.append(('sound/startup', lambda: bench_sound_startup(5)))
+
+    results = {}
+    for name, run in cases:
+        if args.filter not in name:
+            continue
+        results[name] = run()
+        row = " | ".join(f"{phase} p50 {stats['p50']:7.3f} p95 {stats['p95']:7.3f} p99 {stats['p99']:7.3f}"
+                         for phase, stats in results[name].items())
+        print(f"{name:<24} {row} ms")
+
+    if args.output:
+        report = {
+            'meta': {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                     'platform': platform.platform(), 'frames': args.frames},
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', 'src'))
+RUNS = 11
+
+# Starts the game in a fresh interpreter and reports, in ms: process start to the first flip of the
+# menu, Game() construction to that flip, and Game() construction until every sound has loaded
+FIRST_FRAME = f"""
+import time
+start = time.perf_counter()
+import os, sys
+sys.path.insert(0, {SRC_DIR!r})
+import pygame
+import sound_manager
+flip = pygame.display.flip
+managers = []
+init = sound_manager.SoundManager.__init__
+
+def tracked_init(self, *args, **kwargs):
+    init(self, *args, **kwargs)
+    managers.append(self)
+
+def first_flip():
+    flip()
+    first_frame = time.perf_counter()
+    for manager in managers:
+        getattr(manager, 'wait', lambda: None)()  # Loading was synchronous before the background loader
+    loaded = time.perf_counter()
+    print((first_frame - start) * 1000, (first_frame - game_start) * 1000, (loaded - game_start) * 1000)
+    sys.stdout.flush()
+    os._exit(0)
+
+sound_manager.SoundManager.__init__ = tracked_init
+pygame.display.flip = first_flip
+import main
+game_start = time.perf_counter()
+main.Game().run()
+"""
+
+def first_frame_ms(home):
+    env = dict(os.environ, HOME=home, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    output = subprocess.run([sys.executable, '-c', FIRST_FRAME], env=env, capture_output=True, text=True, check=True)
+    return [float(value) for value in output.stdout.strip().splitlines()[-1].split()]
+
+def median(runs, column):
+    return sorted(run[column] for run in runs)[len(runs) // 2]
+
+def main():
+    home = tempfile.mkdtemp(prefix='code_breaker_startup_')
+    try:
+        cold = []
+        for _ in range(RUNS):
+            shutil.rmtree(os.path.join(home, '.cache'), ignore_errors=True)
+            cold.append(first_frame_ms(home))
+        warm = [first_frame_ms(home) for _ in range(RUNS)]
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    print(f"{'cache':<6}{'process to frame':>18}{'Game() to frame':>18}{'Game() to sounds':>18}  (medians, ms)")
+    for label, runs in (('cold', cold), ('warm', warm)):
+        print(f"{label:<6}{median(runs, 0):>18.1f}{median(runs, 1):>18.1f}{median(runs, 2):>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import random
+import timeit
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import pygame
+from utils.maze_generator import generate_maze, merge_wall_tiles, patrol_route
+from utils.navigation import NavGrid
+from utils.spatial_hash import SpatialHash
+from levels.ai_showdown import AI, Player
+from swarm import AISwarm
+
+TILE_SIZE = 40
+FRAMES = 50
+
+def build(count, cols=60, rows=60, seed=1):
+    rng = random.Random(seed)
+    tiles, width, height = generate_maze(cols, rows, seed)
+    walls = [pygame.Rect(rect) for rect in merge_wall_tiles(tiles, width, height, TILE_SIZE)]
+    nav = NavGrid(walls, width * TILE_SIZE, height * TILE_SIZE, TILE_SIZE)
+    ais = []
+    for _ in range(count):
+        route = []
+        for col, row in patrol_route(tiles, width, rng.randrange(cols), rng.randrange(rows), 6, rng):
+            route.append(((2 * col + 1) * TILE_SIZE + 10, (2 * row + 1) * TILE_SIZE + 10))
+        ais.append(AI(route[0][0], route[0][1], route))
+    player = Player(TILE_SIZE + 10, TILE_SIZE + 10)
+    return ais, nav, SpatialHash(walls), player
+
+def run(count):
+    ais, nav, collision, player = build(count)
+    swarm = AISwarm(ais, nav, collision.rects)
+    nav.update_flow(nav.cell_of(*player.rect.center))
+
+    def objects():
+        for ai in ais:
+            ai.update(player, 0, collision, nav)
+
+    def batched():
+        swarm.update(player, 0, 1 / 60)
+
+    object_time = min(timeit.repeat(objects, number=FRAMES, repeat=3)) / FRAMES
+    swarm_time = min(timeit.repeat(batched, number=FRAMES, repeat=3)) / FRAMES
+    print(f"{count:>6} bots | AI objects {object_time * 1000:8.3f} ms/frame | "
+          f"swarm {swarm_time * 1000:7.3f} ms/frame | x{object_time / swarm_time:.1f}")
+
+def recovery(count=64, size=20, chase_ms=4000, hidden_ms=60000, step_ms=1000 / 60):
+    # Both engines chase a player for chase_ms, then lose them; every bot should find its patrol again
+    results = []
+    for engine in ('AI objects', 'swarm'):
+        ais, nav, collision, player = build(count, size, size)
+        swarm = AISwarm(ais, nav, collision.rects) if engine == 'swarm' else None
+        player.rect.topleft = (size * TILE_SIZE + 10, size * TILE_SIZE + 10)  # Maze centre cell
+        nav.update_flow(nav.cell_of(*player.rect.center))
+        now = 0
+        settled = None
+        start_index = None
+        advanced = [False] * count
+        moved = [False] * count
+        while now < chase_ms + hidden_ms:
+            player.visible = now < chase_ms
+            if swarm:
+                if player.visible:
+                    swarm.alert[:] = True
+                    swarm.alert_time[:] = now
+                swarm.update(player, now, step_ms / 1000)
+                positions = [tuple(p) for p in swarm.pos]
+                indices = list(swarm.patrol_index)
+            else:
+                for ai in ais:
+                    if player.visible:
+                        ai.alert = True
+                        ai.alert_time = now
+                    ai.update(player, now, collision, nav, None, step_ms / 1000)
+                positions = [ai.rect.topleft for ai in ais]
+                indices = [ai.current_point for ai in ais]
+            now += step_ms
+            if now >= chase_ms + 10000:
+                # From 10 s after the player vanished, every bot should still be getting somewhere
+                if settled is None:
+                    settled = positions
+                moved = [m or p != s for m, p, s in zip(moved, positions, settled)]
+            if now >= chase_ms:
+                if start_index is None:
+                    start_index = indices
+                advanced = [a or i != s for a, i, s in zip(advanced, indices, start_index)]
+        results.append((engine, sum(advanced), count - sum(moved)))
+    for engine, advanced, frozen in results:
+        print(f"recovery {engine:<10} | {advanced}/{count} bots moved on along their patrol, "
+              f"{frozen} frozen for the last {(hidden_ms - 10000) // 1000} s")
+    return results
+
+if __name__ == "__main__":
+    if not AISwarm.available:
+        sys.exit("numpy is required for the swarm benchmark")
+    for count in (10, 100, 1000, 10000):
+        run(count)
+    recovery()
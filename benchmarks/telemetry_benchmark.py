@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import shutil
+import random
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+from level_benchmark import LEVEL_CASES, bench_level
+from headless import init_headless
+
+from game_io import VirtualClock
+from game_state import GameState
+from telemetry import Telemetry, EVENT_KINDS, summarize
+import telemetry
+
+EVENTS = 1000000
+FLUSHES = 1000
+
+def bench_emit(log, enabled):
+    # Per-event cost of emit() on the game loop side, with the writer flushing to log meanwhile.
+    # Enough buffers for the whole burst so the log gets every event
+    per_flush = EVENTS // FLUSHES
+    sink = Telemetry(per_flush, FLUSHES + 1)
+    if enabled:
+        sink.start(log)
+    game_state = GameState(VirtualClock())
+    rng = random.Random(0)
+    kinds = [rng.randrange(len(EVENT_KINDS)) for _ in range(1024)]
+    begin = time.perf_counter()
+    for flush in range(FLUSHES):
+        for i in range(per_flush):
+            game_state.clock.now = i * 16
+            sink.emit(kinds[i & 1023], game_state, i, flush)
+        sink.flush()
+    elapsed = time.perf_counter() - begin
+    sink.close()
+    return elapsed / EVENTS * 1e9, sink.dropped
+
+def main():
+    init_headless()
+    temp_dir = tempfile.mkdtemp(prefix='code_breaker_telemetry_')
+    log = os.path.join(temp_dir, 'events.cbt')
+    try:
+        disabled, _ = bench_emit(log, False)
+        enabled, dropped = bench_emit(log, True)
+        print(f"emit: {disabled:.0f} ns per event disabled, {enabled:.0f} ns enabled, {dropped} dropped")
+        size = os.path.getsize(log)
+        print(f"log: {EVENTS} events in {size / 1e6:.1f} MB ({size / EVENTS:.1f} bytes per event)")
+        begin = time.perf_counter()
+        summary = summarize(log)
+        print(f"summarize: {summary['events']} events from {summary['sessions']} sessions "
+              f"in {time.perf_counter() - begin:.2f}s")
+
+        # Frame cost in real levels, logging off and then on
+        for name, level_class, bot_class, options in LEVEL_CASES:
+            if name not in ('firewall', 'circuit/grid8', 'showdown/maze20-ai8'):
+                continue
+            rows = []
+            for enabled in (False, True):
+                telemetry.telemetry = sink = Telemetry()
+                if enabled:
+                    sink.start(log)
+                for module in ('game_state', 'levels.firewall_breach', 'levels.encrypted_room', 'levels.ai_showdown'):
+                    sys.modules[module].telemetry = sink
+                stats = bench_level(level_class, bot_class, options, 600, 30)['update']
+                sink.close()
+                rows.append(f"{'on' if enabled else 'off'} p50 {stats['p50']:.4f} p95 {stats['p95']:.4f}")
+            print(f"{name:<24} update ms: " + " | ".join(rows))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
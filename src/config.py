@@ -1,6 +1,10 @@
+import os
+
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
-FPS = 60
+FPS = 60  # Render cap
+SIMULATION_HZ = 60  # Fixed rate at which levels update, independent of the render rate
+MAX_FRAME_SKIP = 5  # Most simulation steps run per rendered frame before the game slows down instead
 
 # Color constants
 BLACK = (0, 0, 0)
@@ -17,6 +21,54 @@ DIFFICULTY_LEVELS = {
     'medium': {'timer': 100, 'pattern_length': 6, 'score_reward': 200},
     'hard': {'timer': 75, 'pattern_length': 8, 'score_reward': 300}
 }
+FIREWALL_BLINK_MS = 1500  # Each pattern symbol stays lit this long during playback
+FIREWALL_ENDLESS = False  # Firewall Breach never ends, the pattern grows every round until lives run out
+FIREWALL_ENDLESS_GROWTH = 1  # Symbols added to the endless pattern per round won
 
 # Animation settings
-PULSE_SPEED = 200  # Milliseconds for visual pulsing effects
\ No newline at end of file
+PULSE_SPEED = 200  # Milliseconds for visual pulsing effects
+TRANSITION_MS = 2000  # Level title card, the next level loads in the background meanwhile
+PULSE_PHASES = 5  # Pre-rendered pulse frames per circuit piece sprite
+
+# Terminal settings
+TERMINAL_SCROLLBACK = 100000  # Wrapped lines a terminal keeps, scroll with the mouse wheel or Page Up/Down
+
+# Level generation, done ahead of time in a process pool
+SPEC_WORKERS = 2  # Processes generating level content ahead of time
+SPEC_QUEUE_DEPTH = 2  # Specs kept ready per level and difficulty
+
+# Saves
+AUTOSAVE_INTERVAL_MS = 5000  # Simulated time between autosaves of the level being played
+
+# Rendering settings. Levels lay out and draw at WINDOW_WIDTH x WINDOW_HEIGHT, the finished frame is
+# then scaled into the window by the render tier's method, letterboxed to keep its shape
+RENDER_TIER = 'medium'
+RENDER_TIERS = {
+    'low': {'scaling': 'integer', 'max_scale': 2},  # Nearest neighbour, at most 2x, dirty regions only
+    'medium': {'scaling': 'integer'},  # Largest whole multiple that fits, dirty regions only
+    'high': {'scaling': 'smooth'},  # Filtered to fill the window, the whole frame every time
+    'gpu': {'scaling': 'sdl'},  # pygame.SCALED, the SDL renderer scales on present
+}
+DISPLAY_SIZE = None  # Window size at startup, None opens it at the framebuffer size. The window is resizable
+DISPLAY_FULLSCREEN = False  # Cover the desktop, for wall displays
+DIRTY_RECT_RENDERING = False  # Push only changed regions instead of flipping the full frame
+SHOW_DIRTY_RECTS = False  # Debug overlay outlining the regions pushed each frame
+PROFILER_ENABLED = False  # Record frame timings from startup, F4 toggles the overlay, F5 exports a trace
+PROFILER_FRAMES = 600  # Frames kept in the profiler ring buffer
+
+# Gameplay telemetry (score, lives, level events) appended to a log, main.py --telemetry also turns it on
+TELEMETRY_ENABLED = False
+TELEMETRY_BLOCK_EVENTS = 4096  # Events per preallocated buffer, each full buffer is one write
+TELEMETRY_BLOCKS = 4  # Buffers in rotation, events are dropped only if the writer falls this far behind
+
+# Procedural facility for AI Showdown, None keeps the classic single-screen maze
+MAZE_WORLD_SIZE = None  # (cols, rows) of maze cells, e.g. (200, 200)
+MAZE_TILE_SIZE = 40
+MAZE_AI_COUNT = 8
+AI_SWARM_THRESHOLD = 64  # Bot count at which AI Showdown switches to the NumPy swarm engine
+AI_VIEW_DISTANCE = 200  # Pixels an AI can see along an unobstructed line of sight
+AI_VIEW_ANGLE = 120  # Degrees of the view cone while patrolling, alerted AIs look all around
+
+# On-disk caches for precomputed data (visibility tables, ...)
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'code_breaker')
+VISIBILITY_CACHE_ENTRIES = 16  # Tables kept on disk, procedural facilities make a new one per layout
@@ -0,0 +1,111 @@
+import pygame
+from config import *
+
+class Display:
+    # Levels lay out and draw in a fixed WINDOW_WIDTH x WINDOW_HEIGHT framebuffer, present() scales it
+    # into the window, letterboxed, the way the render tier says. Mouse positions are mapped back
+    def __init__(self, size=(WINDOW_WIDTH, WINDOW_HEIGHT), tier=RENDER_TIER, window_size=DISPLAY_SIZE,
+                 fullscreen=DISPLAY_FULLSCREEN):
+        self.size = size
+        self.tier = tier
+        self.scaling = RENDER_TIERS[tier]['scaling']
+        self.max_scale = RENDER_TIERS[tier].get('max_scale')
+        flags = pygame.FULLSCREEN if fullscreen else pygame.RESIZABLE
+        if self.scaling == 'sdl':
+            # SDL's renderer scales and letterboxes on present and maps mouse positions itself
+            try:
+                pygame.display.set_mode(size, flags | pygame.SCALED)
+            except pygame.error as e:
+                print(f"Warning: No renderer for the {tier} tier ({e}), scaling in software")
+                self.scaling = 'integer'
+        if self.scaling != 'sdl':
+            pygame.display.set_mode((0, 0) if fullscreen else (window_size or size), flags)
+        self.window = None
+        self.framebuffer = None
+        self.target = None  # Window subsurface the framebuffer is scaled into
+        self.rect = None  # Where that is in the window
+        self.scale = 1
+        self.direct = False  # Framebuffer is the target itself, nothing to scale
+        self.stale = True  # Next present pushes the whole window
+        self.resize()
+
+    def resize(self):
+        # Lays out the target for the current window size, at startup and whenever the window changes
+        self.window = pygame.display.get_surface()
+        self.stale = True
+        if self.scaling == 'sdl':
+            self.framebuffer = self.window
+            self.rect = self.window.get_rect()
+            self.direct = True
+            return
+        window_width, window_height = self.window.get_size()
+        width, height = self.size
+        fit = min(window_width / width, window_height / height)
+        if self.scaling == 'integer' and fit >= 1:
+            self.scale = int(fit) if not self.max_scale else min(int(fit), self.max_scale)
+        else:
+            self.scale = fit  # Filtered, or a window too small for even 1x
+        self.rect = pygame.Rect(0, 0, round(width * self.scale), round(height * self.scale))
+        self.rect.center = (window_width // 2, window_height // 2)
+        self.window.fill(BLACK)  # Letterbox bars, only drawn here
+        self.target = self.window.subsurface(self.rect)
+        was_direct = self.direct
+        self.direct = self.rect.size == self.size
+        if self.direct:
+            self.framebuffer = self.target  # 1:1, levels draw straight into the window
+        elif self.framebuffer is None or was_direct:
+            self.framebuffer = pygame.Surface(self.size).convert()
+
+    def translate(self, events):
+        # Follows window resizes and maps mouse positions from window to framebuffer pixels
+        translated = []
+        for event in events:
+            if event.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+                self.resize()
+            elif self.scaling != 'sdl' and hasattr(event, 'pos'):
+                attributes = dict(event.dict, pos=self.to_framebuffer(event.pos))
+                if 'rel' in attributes:
+                    attributes['rel'] = (int(event.rel[0] / self.scale), int(event.rel[1] / self.scale))
+                event = pygame.event.Event(event.type, attributes)
+            translated.append(event)
+        return translated
+
+    def to_framebuffer(self, pos):
+        # Positions in the bars map outside the framebuffer, so nothing there gets hit
+        x = (pos[0] - self.rect.x) / self.scale
+        y = (pos[1] - self.rect.y) / self.scale
+        return int(x) if x >= 0 else -1, int(y) if y >= 0 else -1
+
+    def present(self, rects=None):
+        # rects are framebuffer regions changed since the last present, None pushes the whole frame
+        if self.stale:
+            rects = None
+            self.stale = False
+        if self.direct:
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update([rect.move(self.rect.topleft) for rect in rects])
+            return
+
+        if rects is None or not isinstance(self.scale, int):
+            # Filtered scaling blends across region edges, so it always redoes the whole frame
+            if self.scaling == 'smooth':
+                pygame.transform.smoothscale(self.framebuffer, self.rect.size, self.target)
+            else:
+                pygame.transform.scale(self.framebuffer, self.rect.size, self.target)
+            pygame.display.flip()
+            return
+
+        # Whole multiples map each region onto an exact block, only those are scaled and pushed
+        scale = self.scale
+        bounds = self.framebuffer.get_rect()
+        pushed = []
+        for rect in rects:
+            rect = rect.clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            dest = pygame.Rect(rect.x * scale, rect.y * scale, rect.width * scale, rect.height * scale)
+            pygame.transform.scale(self.framebuffer.subsurface(rect), dest.size, self.target.subsurface(dest))
+            pushed.append(dest.move(self.rect.topleft))
+        pygame.display.update(pushed)
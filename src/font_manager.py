@@ -0,0 +1,41 @@
+import pygame
+from collections import OrderedDict
+
+class FontManager:
+    def __init__(self, max_surfaces=512):
+        self.fonts = {}
+        self.surfaces = OrderedDict()  # LRU of rendered text surfaces
+        self.max_surfaces = max_surfaces
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, size, face=None):
+        key = (face, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(face, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, size, color, antialias=True, face=None):
+        key = (text, size, tuple(color), antialias, face)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.get_font(size, face).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Shared process-wide registry, import this instead of building fonts per frame
+font_manager = FontManager()
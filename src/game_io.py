@@ -0,0 +1,31 @@
+import pygame
+
+class RealClock:
+    def ticks(self):
+        return pygame.time.get_ticks()
+
+class VirtualClock:
+    # Simulated milliseconds, advanced explicitly by the fixed-step loop or headless runs.
+    # Fractional steps accumulate in now, levels see whole milliseconds like get_ticks
+    def __init__(self, start=0):
+        self.now = start
+
+    def ticks(self):
+        return int(self.now)
+
+    def advance(self, ms):
+        self.now += ms
+
+class RealKeyboard:
+    def get_pressed(self):
+        return pygame.key.get_pressed()
+
+class VirtualKeyboard:
+    def __init__(self):
+        self.held = set()
+
+    def get_pressed(self):
+        return self
+
+    def __getitem__(self, key):
+        return key in self.held
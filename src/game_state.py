@@ -1,7 +1,12 @@
 from config import DIFFICULTY_LEVELS
+from game_io import RealClock, RealKeyboard
+from telemetry import telemetry, SCORE, LIFE_LOST, NEXT_LEVEL
 
 class GameState:
-    def __init__(self):
+    def __init__(self, clock=None, keyboard=None):
+        # Levels read time and keys through these so headless runs can substitute virtual ones
+        self.clock = clock or RealClock()
+        self.keyboard = keyboard or RealKeyboard()
         self.current_level = 0
         self.score = 0
         self.lives = 3  # Added lives for more forgiving gameplay
@@ -12,13 +17,16 @@ class GameState:
         
     def update_score(self, points):
         self.score += points
+        telemetry.emit(SCORE, self, points, self.score)
         
     def lose_life(self):
         self.lives -= 1
+        telemetry.emit(LIFE_LOST, self, self.lives)
         if self.lives <= 0:
             self.game_over = True
             
     def next_level(self):
         self.current_level += 1
         self.time_remaining = DIFFICULTY_LEVELS[self.difficulty]['timer']
-        self.level_complete = False
\ No newline at end of file
+        self.level_complete = False
+        telemetry.emit(NEXT_LEVEL, self, self.current_level)
\ No newline at end of file
@@ -0,0 +1,169 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# The dummy drivers must be selected before pygame initialises its display and audio
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
+
+from config import *
+from game_state import GameState
+from game_io import VirtualClock, VirtualKeyboard
+from sound_manager import SoundManager
+from levels.firewall_breach import FirewallBreach
+from levels.encrypted_room import EncryptedRoom
+from levels.ai_showdown import AIShowdown
+
+def init_headless():
+    # Levels convert surfaces at construction, so a (dummy) display mode has to exist
+    if not pygame.get_init():
+        pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+class HeadlessSession:
+    def __init__(self, level_class, difficulty='medium', seed=None, step_ms=1000 / SIMULATION_HZ, sound_manager=None, **level_options):
+        init_headless()
+        if seed is not None:
+            random.seed(seed)
+        self.clock = VirtualClock()
+        self.keyboard = VirtualKeyboard()
+        self.game_state = GameState(self.clock, self.keyboard)
+        self.game_state.difficulty = difficulty
+        self.game_state.time_remaining = DIFFICULTY_LEVELS[difficulty]['timer']
+        self.level = level_class(self.game_state, sound_manager or SoundManager(muted=True), **level_options)
+        self.step_ms = step_ms
+        self.level.dt = step_ms / 1000
+        self.steps = 0
+
+    def step(self, events=()):
+        self.clock.advance(self.step_ms)
+        self.level.update(list(events))
+        self.steps += 1
+
+    def finished(self):
+        return self.game_state.level_complete or self.game_state.game_over
+
+    def run(self, policy=None, max_ms=600000):
+        while not self.finished() and self.clock.now < max_ms:
+            self.step(policy(self) if policy else ())
+        return {
+            'complete': self.game_state.level_complete,
+            'score': self.game_state.score,
+            'lives': self.game_state.lives,
+            'steps': self.steps,
+            'simulated_ms': self.clock.ticks(),
+        }
+
+def click(pos):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+class FirewallBot:
+    # Repeats the shown pattern, pressing a wrong button with the given probability
+    def __init__(self, mistake_rate=0.0, interval_ms=300, rng=None):
+        self.mistake_rate = mistake_rate
+        self.interval_ms = interval_ms
+        self.rng = rng or random.Random(0)
+        self.last_tap = 0
+
+    def __call__(self, session):
+        level = session.level
+        now = session.clock.now
+        if level.show_instructions or level.generating_pattern or now - self.last_tap < self.interval_ms:
+            return []
+        self.last_tap = now
+        index = level.expected_symbol()
+        if self.rng.random() < self.mistake_rate:
+            index = (index + self.rng.randrange(1, 4)) % 4
+        return [click(level.buttons[index]['rect'].center)]
+
+class CircuitBot:
+    # Follows the solver hints, clicking one suggested piece at a time
+    def __init__(self, interval_ms=250):
+        self.interval_ms = interval_ms
+        self.last_click = 0
+
+    def __call__(self, session):
+        level = session.level
+        now = session.clock.now
+        if level.show_instructions or now - self.last_click < self.interval_ms:
+            return []
+        suggestion = level.solver_hint()
+        if suggestion is None:
+            return []
+        self.last_click = now
+        row, col, _ = suggestion
+        return [click(level.grid[row][col].rect.center)]
+
+class ChaseBot:
+    # Holds WASD along the shortest path to the override switch, cloaking when an AI is alerted
+    def __init__(self):
+        self.path = None
+
+    def __call__(self, session):
+        level = session.level
+        held = session.keyboard.held
+        held.clear()
+        if level.show_instructions:
+            return []
+        x, y = level.player.rect.center
+        if self.path is None or (self.path and abs(self.path[0][0] - x) + abs(self.path[0][1] - y) > 2 * level.nav.cell_size):
+            self.path = list(level.nav.find_path((x, y), level.override_switch.center) or ())
+        reach = level.player.speed * level.dt  # Distance covered in one step
+        while self.path and abs(self.path[0][0] - x) + abs(self.path[0][1] - y) <= reach:
+            self.path.pop(0)
+        target = self.path[0] if self.path else level.override_switch.center
+        if target[0] > x + 2:
+            held.add(pygame.K_d)
+        elif target[0] < x - 2:
+            held.add(pygame.K_a)
+        if target[1] > y + 2:
+            held.add(pygame.K_s)
+        elif target[1] < y - 2:
+            held.add(pygame.K_w)
+        if level.player.can_cloak and level.any_alert():
+            return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)]
+        return []
+
+LEVELS = {
+    'firewall': (FirewallBreach, FirewallBot),
+    'circuit': (EncryptedRoom, CircuitBot),
+    'showdown': (AIShowdown, ChaseBot),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scripted level sessions headless, faster than real time")
+    parser.add_argument('level', choices=sorted(LEVELS))
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--difficulty', choices=sorted(DIFFICULTY_LEVELS), default='medium')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--endless', action='store_true', help="play Firewall Breach in endless mode")
+    args = parser.parse_args()
+
+    level_class, bot_class = LEVELS[args.level]
+    sound_manager = SoundManager(muted=True)
+    results = []
+    start = time.perf_counter()
+    for i in range(args.sessions):
+        options = {'endless': True} if args.endless and level_class is FirewallBreach else {}
+        session = HeadlessSession(level_class, args.difficulty, args.seed + i, sound_manager=sound_manager, **options)
+        results.append(session.run(bot_class()))
+    elapsed = time.perf_counter() - start
+
+    completed = sum(result['complete'] for result in results)
+    print(f"{args.level} ({args.difficulty}): {args.sessions} sessions in {elapsed:.2f}s "
+          f"({args.sessions / elapsed * 60:.0f} per minute)")
+    print(f"  completed {completed}/{args.sessions}, "
+          f"mean score {sum(r['score'] for r in results) / len(results):.1f}, "
+          f"mean lives left {sum(r['lives'] for r in results) / len(results):.2f}, "
+          f"mean simulated time {sum(r['simulated_ms'] for r in results) / len(results) / 1000:.1f}s")
+
+if __name__ == "__main__":
+    main()
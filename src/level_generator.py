@@ -0,0 +1,34 @@
+import random
+import multiprocessing
+from collections import deque
+from config import *
+
+class LevelGenerator:
+    # Keeps a few level specs per (level, difficulty) generating in worker processes ahead of need
+    def __init__(self, levels, depth=SPEC_QUEUE_DEPTH, processes=SPEC_WORKERS, seed=None):
+        self.levels = levels
+        self.depth = depth
+        self.rng = random.Random(seed)
+        # Started before pygame and the sound loader threads, so forked workers inherit neither
+        self.pool = multiprocessing.Pool(processes)
+        self.queues = {(index, difficulty): deque() for index in range(len(levels)) for difficulty in DIFFICULTY_LEVELS}
+
+    def prefetch(self, difficulty):
+        # Queues fill once their difficulty is picked, so startup isn't spent on all of them
+        for index in range(len(self.levels)):
+            self._fill(index, difficulty)
+
+    def _fill(self, index, difficulty):
+        queue = self.queues[(index, difficulty)]
+        while len(queue) < self.depth:
+            seed = self.rng.randrange(2 ** 32)
+            queue.append((seed, self.pool.apply_async(self.levels[index].generate_spec, (difficulty, seed))))
+
+    def take(self, index, difficulty):
+        # Oldest queued spec as (seed, pending result), the seed is what recordings need to rebuild it
+        seed, result = self.queues[(index, difficulty)].popleft()
+        self._fill(index, difficulty)
+        return seed, result
+
+    def close(self):
+        self.pool.terminate()
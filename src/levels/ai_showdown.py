@@ -1,26 +1,64 @@
 import pygame
 import random
+import math
+import struct
 from levels.base_level import BaseLevel
 from config import *
+from font_manager import font_manager
+from utils.spatial_hash import SpatialHash
+from utils.navigation import NavGrid
+from utils.visibility import VisibilityTable
+from utils.level_specs import showdown_spec
+from tilemap import TileMap, Camera
+from utils.helpers import clamp
+from swarm import AISwarm
+from profiler import profiler
+from snapshot import SnapshotReader
+from telemetry import telemetry, ALERT, CAUGHT, CLOAK
+
+# Maze cells (0, 0 for the classic screen) and bot count, the maze itself comes back from the spec seed
+LAYOUT = struct.Struct('<HHI')
+LEVEL_STATE = struct.Struct('<BqB')  # show instructions, instruction time, swarm engine
+PLAYER_STATE = struct.Struct('<iiiiddBqB')  # rect, previous, remainder, visible, cloak time, can cloak
+# rect, previous, remainder, patrol point, alert, alert time, facing, path length (NO_PATH for none),
+# path index, followed by the cached path as (x, y) cell centres
+AI_STATE = struct.Struct('<iiiiddHBqddHH')
+WAYPOINT = struct.Struct('<ii')
+NO_PATH = 0xFFFF
+
+def whole_pixels(remainder, dx, dy):
+    # Rects hold integer positions, keep the fractional part of time-based steps for the next step
+    remainder[0] += dx
+    remainder[1] += dy
+    step_x, step_y = round(remainder[0]), round(remainder[1])
+    remainder[0] -= step_x
+    remainder[1] -= step_y
+    return step_x, step_y
 
 class Player:
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, 20, 20)
-        self.speed = 6
+        self.previous = self.rect.topleft  # Position before the last simulation step, for interpolation
+        self.remainder = [0.0, 0.0]
+        self.speed = 360  # Pixels per second
         self.visible = True
         self.cloak_time = 0
         self.can_cloak = True
         
-    def move(self, dx, dy, walls):
-        original_x = self.rect.x
-        original_y = self.rect.y
-        self.rect.x += dx * self.speed
-        self.rect.y += dy * self.speed
-        for wall in walls:
-            if self.rect.colliderect(wall):
-                self.rect.x = original_x
-                self.rect.y = original_y
-                break
+    def move(self, dx, dy, collision, dt):
+        collision.move(self.rect, *whole_pixels(self.remainder, dx * self.speed * dt, dy * self.speed * dt))
+
+    def snapshot(self):
+        return PLAYER_STATE.pack(*self.rect.topleft, *self.previous, *self.remainder,
+                                 self.visible, self.cloak_time, self.can_cloak)
+
+    def restore(self, reader):
+        x, y, px, py, rx, ry, visible, self.cloak_time, can_cloak = reader.unpack(PLAYER_STATE)
+        self.rect.topleft = (x, y)
+        self.previous = (px, py)
+        self.remainder = [rx, ry]
+        self.visible = bool(visible)
+        self.can_cloak = bool(can_cloak)
                 
     def toggle_cloak(self, current_time):
         if self.can_cloak:
@@ -33,23 +71,34 @@ class Player:
 class AI:
     def __init__(self, x, y, patrol_points):
         self.rect = pygame.Rect(x, y, 20, 20)
-        self.speed = 5
+        self.previous = self.rect.topleft
+        self.remainder = [0.0, 0.0]
+        self.speed = 300  # Pixels per second
         self.patrol_points = patrol_points
         self.current_point = 0
         self.alert = False
         self.alert_time = 0
+        self.path = None  # Cached patrol path shared through NavGrid.find_path
+        self.path_index = 0
+        self.facing = (1.0, 0.0)
         
-    def update(self, player, current_time, walls):
+    def update(self, player, current_time, collision, nav=None, visibility=None, dt=1 / SIMULATION_HZ):
+        self.previous = self.rect.topleft
         if self.alert and current_time - self.alert_time > 3000:
             self.alert = False
             
         if self.alert and player.visible:
-            dx = player.rect.x - self.rect.x
-            dy = player.rect.y - self.rect.y
-            dist = pygame.math.Vector2(dx, dy).length()
-            if dist > 0:
-                dx, dy = dx/dist, dy/dist
-                self.move(dx, dy, walls)
+            self.path = None
+            waypoint = nav.next_waypoint(*self.rect.center) if nav else None
+            if waypoint:
+                self.step_towards(waypoint, collision, dt)
+            else:
+                dx = player.rect.x - self.rect.x
+                dy = player.rect.y - self.rect.y
+                dist = pygame.math.Vector2(dx, dy).length()
+                if dist > 0:
+                    dx, dy = dx/dist, dy/dist
+                    self.move(dx, dy, collision, dt)
         else:
             if self.patrol_points:
                 target = self.patrol_points[self.current_point]
@@ -58,72 +107,156 @@ class AI:
                 dist = pygame.math.Vector2(dx, dy).length()
                 if dist < 10:
                     self.current_point = (self.current_point + 1) % len(self.patrol_points)
+                    self.path = None
                 else:
-                    dx, dy = dx/dist, dy/dist
-                    self.move(dx, dy, walls)
+                    waypoint = self._next_path_waypoint(nav, target) if nav else None
+                    if waypoint:
+                        self.step_towards(waypoint, collision, dt)
+                    else:
+                        dx, dy = dx/dist, dy/dist
+                        self.move(dx, dy, collision, dt)
                     
-        if player.visible and self.rect.colliderect(player.rect.inflate(150, 150)):
+        if player.visible and self.can_see(player, visibility):
             self.alert = True
             self.alert_time = current_time
+
+    def snapshot(self):
+        path = self.path if self.path is not None else []
+        return AI_STATE.pack(*self.rect.topleft, *self.previous, *self.remainder, self.current_point,
+                             self.alert, self.alert_time, *self.facing,
+                             len(path) if self.path is not None else NO_PATH, self.path_index
+                             ) + b''.join(WAYPOINT.pack(*point) for point in path)
+
+    def restore(self, reader):
+        (x, y, px, py, rx, ry, self.current_point, alert, self.alert_time, fx, fy,
+         path_length, self.path_index) = reader.unpack(AI_STATE)
+        self.rect.topleft = (x, y)
+        self.previous = (px, py)
+        self.remainder = [rx, ry]
+        self.alert = bool(alert)
+        self.facing = (fx, fy)
+        self.path = None if path_length == NO_PATH else [reader.unpack(WAYPOINT) for _ in range(path_length)]
+
+    def can_see(self, player, visibility):
+        if visibility is None:
+            return self.rect.colliderect(player.rect.inflate(150, 150))
+        dx = player.rect.centerx - self.rect.centerx
+        dy = player.rect.centery - self.rect.centery
+        dist = math.hypot(dx, dy)
+        if dist > AI_VIEW_DISTANCE:
+            return False
+        # Patrolling bots only see inside their view cone, alerted bots look all around
+        if not self.alert and dist > 0:
+            if (dx * self.facing[0] + dy * self.facing[1]) / dist < math.cos(math.radians(AI_VIEW_ANGLE / 2)):
+                return False
+        return visibility.line_of_sight(self.rect.center, player.rect.center)
+                    
+    def _next_path_waypoint(self, nav, target):
+        if self.path is None:
+            self.path = nav.find_path(self.rect.center, (target[0] + 10, target[1] + 10)) or ()
+            self.path_index = 0
+        while self.path_index < len(self.path):
+            wx, wy = self.path[self.path_index]
+            if abs(wx - self.rect.centerx) + abs(wy - self.rect.centery) > 1:
+                return wx, wy
+            self.path_index += 1
+        return None
                     
-    def move(self, dx, dy, walls):
-        original_x = self.rect.x
-        original_y = self.rect.y
-        self.rect.x += dx * self.speed
-        self.rect.y += dy * self.speed
-        for wall in walls:
-            if self.rect.colliderect(wall):
-                self.rect.x = original_x
-                self.rect.y = original_y
-                break
+    def move(self, dx, dy, collision, dt):
+        self._face(dx, dy)
+        collision.move(self.rect, *whole_pixels(self.remainder, dx * self.speed * dt, dy * self.speed * dt))
+
+    def step_towards(self, point, collision, dt):
+        # Each axis closes at most one step, which re-centres the bot in its corridor cell
+        step = self.speed * dt
+        dx = clamp(point[0] - self.rect.centerx, -step, step)
+        dy = clamp(point[1] - self.rect.centery, -step, step)
+        self._face(dx, dy)
+        collision.move(self.rect, *whole_pixels(self.remainder, dx, dy))
+
+    def _face(self, dx, dy):
+        length = math.hypot(dx, dy)
+        if length > 0:
+            self.facing = (dx / length, dy / length)
 
 class AIShowdown(BaseLevel):
-    def __init__(self, game_state, sound_manager):
+    generate_spec = staticmethod(showdown_spec)
+
+    def __init__(self, game_state, sound_manager, maze_size=MAZE_WORLD_SIZE, seed=None, ai_count=MAZE_AI_COUNT, spec=None):
         super().__init__(game_state, sound_manager)
-        self.walls = self._create_maze()
-        self.player = Player(50, 50)
-        self.ais = [
-            AI(WINDOW_WIDTH - 100, WINDOW_HEIGHT - 100, [
-                (WINDOW_WIDTH - 100, WINDOW_HEIGHT - 100),
-                (WINDOW_WIDTH - 100, 100),
-                (100, 100),
-                (100, WINDOW_HEIGHT - 100)
-            ]),
-            AI(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2, [
-                (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2),
-                (WINDOW_WIDTH // 2, 50),
-                (50, WINDOW_HEIGHT // 2),
-                (WINDOW_WIDTH - 50, WINDOW_HEIGHT - 50)
-            ])
-        ]
-        self.override_switch = pygame.Rect(WINDOW_WIDTH - 80, 50, 30, 30)
+        if spec is None:
+            seed = random.randrange(2 ** 32) if seed is None else seed
+            spec = showdown_spec(game_state.difficulty, seed, maze_size, ai_count)
+        self._build(spec)
+        self.collision = SpatialHash(self.walls)
+        self.nav = NavGrid(self.walls, self.camera.world_width, self.camera.world_height,
+                           MAZE_TILE_SIZE if self.tilemap else 20)
+        self.visibility = VisibilityTable(self.nav, AI_VIEW_DISTANCE, CACHE_DIR)
+        self.swarm = None
+        if len(self.ais) >= AI_SWARM_THRESHOLD and AISwarm.available:
+            self.swarm = AISwarm(self.ais, self.nav, self.walls, self.visibility)
+        self.player = Player(*self.start_pos)
+        self.camera.follow(self.player.rect)
         self.show_instructions = True
-        self.instruction_time = pygame.time.get_ticks()
+        self.instruction_time = self.clock.ticks()
         # Precise instructions
         self.terminal.add_message(">> Welcome to Level 3: AI Chase!")
-        self.terminal.add_message(">> Goal: Reach the pulsing red switch (top-right).")
-        self.terminal.add_message(">> Move with W/A/S/D. Avoid 2 AIs (cyan/red boxes).")
+        if self.tilemap:
+            self.terminal.add_message(">> Goal: Reach the pulsing red switch (far bottom-right).")
+            self.terminal.add_message(f">> Move with W/A/S/D. Avoid {len(self.ais)} AIs (cyan/red boxes).")
+        else:
+            self.terminal.add_message(">> Goal: Reach the pulsing red switch (top-right).")
+            self.terminal.add_message(">> Move with W/A/S/D. Avoid 2 AIs (cyan/red boxes).")
         self.terminal.add_message(">> SPACE to cloak (2s, 5s cooldown) when near AIs.")
         self.terminal.add_message(">> If caught, reset. Navigate blue walls carefully!")
-        
-    def _create_maze(self):
-        walls = []
-        wall_rects = [
-            (200, 100, 20, 400),
-            (400, 100, 20, 300),
-            (600, 200, 20, 400),
-            (100, 200, 200, 20),
-            (300, 300, 200, 20),
-            (500, 400, 200, 20),
-            (100, 500, 400, 20),
-            (300, 150, 100, 20)
-        ]
-        for rect in wall_rects:
-            walls.append(pygame.Rect(rect))
-        return walls
-        
+
+    def _build(self, spec):
+        self.seed = spec['seed']
+        self.maze_size = spec['maze_size']
+        self.walls = [pygame.Rect(rect) for rect in spec['walls']]
+        self.tilemap = None
+        if spec['tiles'] is not None:
+            width, height = spec['tile_grid']
+            self.tilemap = TileMap(bytearray(spec['tiles']), width, height, MAZE_TILE_SIZE)
+        self.camera = Camera(WINDOW_WIDTH, WINDOW_HEIGHT, *spec['world_size'])
+        self.start_pos = spec['start']
+        self.override_switch = pygame.Rect(spec['switch'])
+        self.ais = [AI(route[0][0], route[0][1], route) for route in spec['routes']]
+
+    def snapshot(self):
+        cols, rows = self.maze_size or (0, 0)
+        parts = [LAYOUT.pack(cols, rows, len(self.ais)),
+                 LEVEL_STATE.pack(self.show_instructions, self.instruction_time, self.swarm is not None),
+                 self.player.snapshot()]
+        if self.swarm:
+            parts.append(self.swarm.snapshot())
+        else:
+            parts.extend(ai.snapshot() for ai in self.ais)
+        return b''.join(parts)
+
+    @classmethod
+    def from_snapshot(cls, game_state, sound_manager, seed, data):
+        reader = SnapshotReader(data)
+        cols, rows, ai_count = reader.unpack(LAYOUT)
+        maze_size = (cols, rows) if cols else None
+        spec = showdown_spec(game_state.difficulty, seed, maze_size, ai_count)
+        level = cls(game_state, sound_manager, spec=spec)
+        show_instructions, level.instruction_time, swarm = reader.unpack(LEVEL_STATE)
+        if bool(swarm) != (level.swarm is not None):
+            raise ValueError("Save was made with a different AI engine, NumPy is missing or was added since")
+        level.show_instructions = bool(show_instructions)
+        level.player.restore(reader)
+        if level.swarm:
+            level.swarm.restore(reader)
+        else:
+            for ai in level.ais:
+                ai.restore(reader)
+        level.camera.follow(level.player.rect)
+        level.terminal.add_message(">> Session restored. Reach the switch!")
+        return level
+
     def update(self, events):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.ticks()
         
         if self.show_instructions:
             if current_time - self.instruction_time > 7000:
@@ -131,22 +264,34 @@ class AIShowdown(BaseLevel):
                 self.terminal.add_message(">> Start moving! Cloak to dodge AIs, reach the switch!")
             return
             
-        keys = pygame.key.get_pressed()
+        keys = self.keyboard.get_pressed()
         dx = keys[pygame.K_d] - keys[pygame.K_a]
         dy = keys[pygame.K_s] - keys[pygame.K_w]
-        self.player.move(dx, dy, self.walls)
+        self.player.previous = self.player.rect.topleft
+        self.player.move(dx, dy, self.collision, self.dt)
         
         for event in events:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
                 if self.player.toggle_cloak(current_time):
                     self.sound_manager.play('power_up')
                     self.terminal.add_message(">> Cloaking active (2s)!")
-                    if any(ai.alert for ai in self.ais):
+                    telemetry.emit(CLOAK, self.game_state, self.any_alert())
+                    if self.any_alert():
                         self.game_state.update_score(50)
                         self.terminal.add_message(">> +50 for stealth!")
         
-        for ai in self.ais:
-            ai.update(self.player, current_time, self.walls)
+        alerted = self.any_alert()
+        if alerted:
+            with profiler.span('flow_field'):
+                self.nav.update_flow(self.nav.cell_of(*self.player.rect.center))
+        with profiler.span('ai_update'):
+            if self.swarm:
+                self.swarm.update(self.player, current_time, self.dt)
+            else:
+                for ai in self.ais:
+                    ai.update(self.player, current_time, self.collision, self.nav, self.visibility, self.dt)
+        if not alerted and telemetry.enabled and self.any_alert():
+            telemetry.emit(ALERT, self.game_state, self._alert_count())
         
         if self.player.rect.colliderect(self.override_switch):
             self.sound_manager.play('success')
@@ -154,50 +299,86 @@ class AIShowdown(BaseLevel):
             self.game_state.update_score(DIFFICULTY_LEVELS[self.game_state.difficulty]['score_reward'])
             self.game_state.level_complete = True
             
-        for ai in self.ais:
-            if self.player.visible and self.player.rect.colliderect(ai.rect):
-                self.sound_manager.play('alert')
-                self.terminal.add_message(">> Caught by AI! Back to start.")
-                self.game_state.lose_life()
-                self.terminal.add_message(f">> Lives remaining: {self.game_state.lives}")
-                self.player.rect.topleft = (50, 50)
-            
-            if ai.alert and current_time - ai.alert_time < 1000:
-                self.sound_manager.play('alert', volume=0.5)
+        if self.swarm:
+            if self.player.visible and self.swarm.touches(self.player.rect):
+                self._caught()
+            if self.swarm.recently_alerted(current_time):
+                self.sound_manager.play('detected', volume=0.5)
+        else:
+            for ai in self.ais:
+                if self.player.visible and self.player.rect.colliderect(ai.rect):
+                    self._caught()
+                
+                if ai.alert and current_time - ai.alert_time < 1000:
+                    self.sound_manager.play('detected', volume=0.5)
         
         if not self.player.can_cloak and current_time - self.player.cloak_time > 2000:
             self.player.can_cloak = True
             self.player.visible = True
             self.terminal.add_message(">> Cloak recharged (5s cooldown)!")
             
-    def draw(self, screen):
-        screen.fill(BLACK)
+    def any_alert(self):
+        if self.swarm:
+            return self.swarm.any_alert()
+        return any(ai.alert for ai in self.ais)
+
+    def _alert_count(self):
+        if self.swarm:
+            return self.swarm.alert_count()
+        return sum(ai.alert for ai in self.ais)
+
+    def _caught(self):
+        telemetry.emit(CAUGHT, self.game_state, *self.player.rect.center)
+        self.sound_manager.play('alert')
+        self.terminal.add_message(">> Caught by AI! Back to start.")
+        self.game_state.lose_life()
+        self.terminal.add_message(f">> Lives remaining: {self.game_state.lives}")
+        self.player.rect.topleft = self.start_pos
+        self.player.previous = self.start_pos
+
+    def draw_background(self, surface):
         for wall in self.walls:
-            pygame.draw.rect(screen, BLUE, wall)
+            pygame.draw.rect(surface, BLUE, wall)
+
+    def draw(self, screen):
+        camera = self.camera
+        player_rect = self.interpolate(self.player.rect, self.player.previous)
+        if camera.follow(player_rect):
+            self.full_redraw = True
+        if self.tilemap:
+            screen.fill(BLACK)
+            self.tilemap.draw(screen, camera)
+        else:
+            self.blit_background(screen)
         
-        pulse_factor = (pygame.time.get_ticks() % PULSE_SPEED) / PULSE_SPEED
-        switch_rect = self.override_switch.inflate(int(10 * pulse_factor), int(10 * pulse_factor))
-        pygame.draw.rect(screen, RED, switch_rect)
-        pygame.draw.rect(screen, YELLOW, switch_rect, 3)  # Highlight switch
+        pulse_factor = (self.clock.ticks() % PULSE_SPEED) / PULSE_SPEED
+        if camera.is_visible(self.override_switch.inflate(10, 10)):
+            switch_rect = camera.apply(self.override_switch.inflate(int(10 * pulse_factor), int(10 * pulse_factor)))
+            pygame.draw.rect(screen, RED, switch_rect)
+            pygame.draw.rect(screen, YELLOW, switch_rect, 3)  # Highlight switch
+            self.mark_dirty(camera.apply(self.override_switch.inflate(10, 10)))
         
         if self.player.visible:
-            pygame.draw.rect(screen, GREEN, self.player.rect)
-            for ai in self.ais:
-                if ai.alert:
-                    pygame.draw.rect(screen, RED, self.player.rect.inflate(150, 150), 1)  # Danger zone
+            pygame.draw.rect(screen, GREEN, camera.apply(player_rect))
+            self.mark_dirty(camera.apply(player_rect.inflate(150, 150)))
+            if self.any_alert():
+                pygame.draw.rect(screen, RED, camera.apply(player_rect.inflate(150, 150)), 1)  # Danger zone
         
-        for ai in self.ais:
-            ai_color = RED if ai.alert else CYAN
-            if ai.alert:
-                pulse_factor = (pygame.time.get_ticks() % PULSE_SPEED) / PULSE_SPEED
-                ai_size = ai.rect.inflate(int(10 * pulse_factor), int(10 * pulse_factor))
-                pygame.draw.rect(screen, ai_color, ai_size)
+        if self.swarm:
+            bots = self.swarm.visible(camera.rect, self.interpolation)
+        else:
+            bots = ((self.interpolate(ai.rect, ai.previous), ai.alert) for ai in self.ais
+                    if camera.is_visible(ai.rect.inflate(10, 10)))
+        for rect, alert in bots:
+            ai_color = RED if alert else CYAN
+            if alert:
+                ai_size = rect.inflate(int(10 * pulse_factor), int(10 * pulse_factor))
+                pygame.draw.rect(screen, ai_color, camera.apply(ai_size))
             else:
-                pygame.draw.rect(screen, ai_color, ai.rect)
+                pygame.draw.rect(screen, ai_color, camera.apply(rect))
+            self.mark_dirty(camera.apply(rect.inflate(10, 10)))
             
-        self.terminal.draw(screen)
-        self.draw_score(screen)
+        self.draw_hud(screen)
         
-        font = pygame.font.Font(None, 36)
-        text = font.render("Level 3: AI Chase - Space to cloak", True, YELLOW)
+        text = font_manager.render("Level 3: AI Chase - Space to cloak", 36, YELLOW)
         screen.blit(text, (10, 10))
\ No newline at end of file
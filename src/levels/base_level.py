@@ -2,12 +2,20 @@ from abc import ABC, abstractmethod
 import pygame
 from config import *
 from ui_elements import Terminal  # Add this import
+from font_manager import font_manager
 
 class BaseLevel(ABC):
     def __init__(self, game_state, sound_manager):
         self.game_state = game_state
         self.sound_manager = sound_manager
-        self.terminal = Terminal(10, WINDOW_HEIGHT - 150, WINDOW_WIDTH - 20, 140)
+        self.clock = game_state.clock
+        self.keyboard = game_state.keyboard
+        self.terminal = Terminal(10, WINDOW_HEIGHT - 150, WINDOW_WIDTH - 20, 140, self.clock)
+        self.dirty_rects = []  # Regions changed this frame, used by the dirty-rect renderer
+        self.full_redraw = True
+        self.background = None  # Pre-baked static layer, rebuilt by invalidate_background
+        self.dt = 1 / SIMULATION_HZ  # Seconds per update, the game loop steps levels at a fixed rate
+        self.interpolation = 1.0  # Fraction of the next step elapsed when drawing
         
     @abstractmethod
     def update(self, events):
@@ -17,7 +25,40 @@ class BaseLevel(ABC):
     def draw(self, screen):
         pass
         
+    def draw_background(self, surface):
+        # Override to draw static geometry once into the cached background layer
+        pass
+
+    def invalidate_background(self):
+        self.background = None
+        self.full_redraw = True
+
+    def blit_background(self, screen):
+        if self.background is None or self.background.get_size() != screen.get_size():
+            self.background = pygame.Surface(screen.get_size()).convert()
+            self.background.fill(BLACK)
+            self.draw_background(self.background)
+        screen.blit(self.background, (0, 0))
+
+    def interpolate(self, rect, previous):
+        # Where a moving rect is drawn between its previous and current simulation positions
+        alpha = self.interpolation
+        return pygame.Rect(round(previous[0] + (rect.x - previous[0]) * alpha),
+                           round(previous[1] + (rect.y - previous[1]) * alpha), rect.width, rect.height)
+
+    def mark_dirty(self, rect):
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def get_dirty_rects(self):
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
+
+    def draw_hud(self, screen):
+        self.terminal.draw(screen)
+        self.mark_dirty(self.terminal.rect)
+        self.draw_score(screen)
+
     def draw_score(self, screen):
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Score: {self.game_state.score} | Lives: {self.game_state.lives}", True, WHITE)
-        screen.blit(score_text, (10, 50))
\ No newline at end of file
+        score_text = font_manager.render(f"Score: {self.game_state.score} | Lives: {self.game_state.lives}", 36, WHITE)
+        self.mark_dirty(screen.blit(score_text, (10, 50)))
\ No newline at end of file
@@ -1,13 +1,28 @@
 import pygame
 import random
-import math
+import struct
 from levels.base_level import BaseLevel
 from config import *
+from font_manager import font_manager
+from piece_atlas import PieceAtlas, LinkOverlay, IDLE, CONNECTED, LOCKED
+from profiler import profiler
+from snapshot import SnapshotReader
+from telemetry import telemetry, ROTATE, LOCK
+from utils.circuit_board import CircuitBoard, DIRECTIONS, to_mask
+from utils.circuit_solver import Solution, rotations
+from utils.level_specs import circuit_spec
+
+LAYOUT = struct.Struct('<H')  # grid size, the board itself comes back from the spec seed
+# show instructions, start, instruction, flash and progress flash times, connected count, hints used,
+# hint shown, hint time, hinted piece (-1 for none), hint text bytes, locked pieces. Then the hint text,
+# one mask byte and one quarter-turn byte per piece, and (piece, lock time) for each locked piece
+STATE = struct.Struct('<BqqqqIBBqiHI')
+LOCK_STATE = struct.Struct('<Iq')
 
 class CircuitPiece:
-    def __init__(self, x, y, size):
+    def __init__(self, x, y, size, connections=None):
         self.rect = pygame.Rect(x, y, size, size)
-        self.connections = random.choice([
+        self.connections = connections or random.choice([
             [True, True, False, False],
             [True, False, True, False],
             [True, True, True, False],
@@ -23,36 +38,36 @@ class CircuitPiece:
         if not self.locked:
             self.rotation = (self.rotation + 90) % 360
             self.connections = self.connections[1:] + [self.connections[0]]
-        
-    def draw(self, screen):
-        pulse_factor = ((pygame.time.get_ticks() + self.pulse_offset) % PULSE_SPEED) / PULSE_SPEED
-        size_offset = int(5 * pulse_factor) if not self.locked else 0
-        draw_rect = self.rect.inflate(-size_offset, -size_offset)
-        color = RED if self.locked else (BLUE if self.connected else WHITE)
-        pygame.draw.rect(screen, color, draw_rect, 2)
-        
-        center = self.rect.centerx, self.rect.centery
-        size = self.rect.width // 2
-        
-        for i, connected in enumerate(self.connections):
-            if connected:
-                angle = i * 90 + self.rotation
-                end_x = center[0] + size * math.cos(math.radians(angle))
-                end_y = center[1] - size * math.sin(math.radians(angle))
-                line_color = CYAN if self.connected else (GREEN if not self.locked else RED)
-                pygame.draw.line(screen, line_color, center, (end_x, end_y), 3 + int(2 * pulse_factor))
+
+    def state(self):
+        return LOCKED if self.locked else (CONNECTED if self.connected else IDLE)
 
 class EncryptedRoom(BaseLevel):
-    def __init__(self, game_state, sound_manager):
+    generate_spec = staticmethod(circuit_spec)
+
+    def __init__(self, game_state, sound_manager, grid_size=4, spec=None):
         super().__init__(game_state, sound_manager)
-        self.grid_size = 4
-        self.piece_size = 80
-        self.grid = self._create_grid()
-        self.start_time = pygame.time.get_ticks()
+        if spec is None:
+            spec = circuit_spec(game_state.difficulty, random.randrange(2 ** 32), grid_size)
+        self.seed = spec['seed']
+        self.grid_size = spec['grid_size']
+        self.piece_size = max(1, min(80, 400 // self.grid_size))
+        self.grid_x = (WINDOW_WIDTH - (self.grid_size * self.piece_size)) // 2
+        self.grid_y = (WINDOW_HEIGHT - (self.grid_size * self.piece_size)) // 2 - 50
+        self.grid = self._create_grid(spec)
+        self.pieces = [piece for row in self.grid for piece in row]
+        self.board = CircuitBoard(self.grid_size, [to_mask(piece.connections) for piece in self.pieces])
+        # Pieces are blitted from pre-rendered sprites, links from an overlay patched on each rotation
+        self.atlas = PieceAtlas(self.piece_size)
+        self.links = LinkOverlay(self.board, (self.grid_x, self.grid_y), self.piece_size)
+        self.hint_piece = None
+        self.locked_pieces = []
+        self.start_time = self.clock.ticks()
         self.flash_time = 0
         self.show_instructions = True
-        self.instruction_time = pygame.time.get_ticks()
+        self.instruction_time = self.clock.ticks()
         self.progress_flash = 0
+        self.flashing = False  # A flash was drawn last frame
         self.connected_count = 0
         # Hint system
         self.hint_button = pygame.Rect(WINDOW_WIDTH - 100, WINDOW_HEIGHT - 50, 80, 30)
@@ -69,63 +84,109 @@ class EncryptedRoom(BaseLevel):
         ]
         # Initial instructions
         self.terminal.add_message(">> Welcome to Level 2: Circuit Puzzle!")
-        self.terminal.add_message(">> Goal: Link all 16 pieces with lines.")
+        self.terminal.add_message(f">> Goal: Link all {self.grid_size * self.grid_size} pieces with lines.")
         self.terminal.add_message(">> Click to rotate. Match green lines side-by-side!")
         self.terminal.add_message(">> Start at yellow piece (top-left). Connect right & down.")
         self.terminal.add_message(">> Wrong moves lock pieces 1s. Tap 'HINT' if stuck!")
+        self.terminal.add_message(f">> Circuit difficulty: {self.difficulty}")
         
-    def _create_grid(self):
+    def snapshot(self):
+        hint_text = self.hint_text.encode()
+        hint_index = self.pieces.index(self.hint_piece) if self.hint_piece is not None else -1
+        parts = [LAYOUT.pack(self.grid_size),
+                 STATE.pack(self.show_instructions, self.start_time, self.instruction_time, self.flash_time,
+                            self.progress_flash, self.connected_count, self.hint_count, self.hint_active,
+                            self.hint_timer, hint_index, len(hint_text), len(self.locked_pieces)),
+                 hint_text, bytes(self.board.masks), bytes(piece.rotation // 90 for piece in self.pieces)]
+        for piece in self.locked_pieces:
+            parts.append(LOCK_STATE.pack(self.pieces.index(piece), piece.lock_time))
+        return b''.join(parts)
+
+    @classmethod
+    def from_snapshot(cls, game_state, sound_manager, seed, data):
+        reader = SnapshotReader(data)
+        grid_size, = reader.unpack(LAYOUT)
+        level = cls(game_state, sound_manager, spec=circuit_spec(game_state.difficulty, seed, grid_size))
+        (show_instructions, level.start_time, level.instruction_time, level.flash_time, level.progress_flash,
+         level.connected_count, level.hint_count, hint_active, level.hint_timer, hint_index, hint_length,
+         locked) = reader.unpack(STATE)
+        level.show_instructions = bool(show_instructions)
+        level.hint_active = bool(hint_active)
+        level.hint_text = reader.take(hint_length).decode()
+        level.hint_piece = level.pieces[hint_index] if hint_index >= 0 else None
+        count = grid_size * grid_size
+        masks = reader.take(count)
+        for piece, mask, turns in zip(level.pieces, masks, reader.take(count)):
+            piece.connections = [bool(mask & (1 << i)) for i in range(4)]
+            piece.rotation = turns * 90
+        for _ in range(locked):
+            index, lock_time = reader.unpack(LOCK_STATE)
+            piece = level.pieces[index]
+            piece.locked = True
+            piece.lock_time = lock_time
+            level.locked_pieces.append(piece)
+        level.board.masks[:] = masks
+        level.board.recompute()
+        level.links.redraw(0, 0, grid_size)
+        level.terminal.add_message(f">> Session restored: {level.board.count}/{count} connected.")
+        return level
+
+    def _create_grid(self, spec):
+        # Boards come from the solver-verified generator, the solved masks drive the hints
+        masks = spec['masks']
+        self.solved_masks = [rotations(mask)[clicks] for mask, clicks in zip(masks, spec['clicks'])]
+        self.difficulty = Solution(spec['clicks'], spec['guesses']).difficulty
         grid = []
-        start_x = (WINDOW_WIDTH - (self.grid_size * self.piece_size)) // 2
-        start_y = (WINDOW_HEIGHT - (self.grid_size * self.piece_size)) // 2 - 50
+        start_x = self.grid_x
+        start_y = self.grid_y
         
         for row in range(self.grid_size):
             grid_row = []
             for col in range(self.grid_size):
                 x = start_x + col * self.piece_size
                 y = start_y + row * self.piece_size
-                piece = CircuitPiece(x, y, self.piece_size)
-                if row == 0 and col == 0:
-                    while not (piece.connections[1] and piece.connections[2]):
-                        piece.rotate()
-                elif row == 0 and col <= 1:
-                    while not piece.connections[3]:
-                        piece.rotate()
-                elif col == 0 and row <= 1:
-                    while not piece.connections[0]:
-                        piece.rotate()
+                mask = masks[row * self.grid_size + col]
+                piece = CircuitPiece(x, y, self.piece_size, [bool(mask & (1 << i)) for i in range(4)])
                 grid_row.append(piece)
             grid.append(grid_row)
         return grid
         
     def check_connections(self):
-        for row in self.grid:
-            for piece in row:
-                piece.connected = False
-        connected_pieces = set()
-        self._flood_fill(0, 0, connected_pieces)
-        return len(connected_pieces), len(connected_pieces) == self.grid_size * self.grid_size
-        
-    def _flood_fill(self, row, col, connected_pieces):
-        if (row, col) in connected_pieces:
-            return
-        current_piece = self.grid[row][col]
-        current_piece.connected = True
-        connected_pieces.add((row, col))
-        
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-        for i, (dr, dc) in enumerate(directions):
-            new_row, new_col = row + dr, col + dc
-            if (0 <= new_row < self.grid_size and 
-                0 <= new_col < self.grid_size and 
-                current_piece.connections[i]):
-                next_piece = self.grid[new_row][new_col]
-                opposite_dir = (i + 2) % 4
-                if next_piece.connections[opposite_dir]:
-                    self._flood_fill(new_row, new_col, connected_pieces)
+        # Full recount, clicks use the incremental CircuitBoard.rotate instead
+        return self.board.recompute()
+
+    def _piece_at(self, pos):
+        col = (pos[0] - self.grid_x) // self.piece_size
+        row = (pos[1] - self.grid_y) // self.piece_size
+        if 0 <= row < self.grid_size and 0 <= col < self.grid_size:
+            return row, col
+        return None
+
+    def solver_hint(self):
+        # Suggest a piece next to the linked chain that is not yet in its solved orientation
+        fallback = None
+        for index, target in enumerate(self.solved_masks):
+            current = self.board.masks[index]
+            if current == target:
+                continue
+            row, col = divmod(index, self.grid_size)
+            if self.grid[row][col].locked:
+                continue
+            clicks = rotations(current).index(target)
+            if any(self.board.is_connected(other) for other in self._adjacent(row, col)):
+                return row, col, clicks
+            if fallback is None:
+                fallback = row, col, clicks
+        return fallback
+
+    def _adjacent(self, row, col):
+        for dr, dc in DIRECTIONS:
+            r, c = row + dr, col + dc
+            if 0 <= r < self.grid_size and 0 <= c < self.grid_size:
+                yield r * self.grid_size + c
     
     def update(self, events):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.ticks()
         
         if self.show_instructions:
             if current_time - self.instruction_time > 7000:
@@ -136,6 +197,7 @@ class EncryptedRoom(BaseLevel):
         # Handle hint popup timeout
         if self.hint_active and current_time - self.hint_timer > 5000:
             self.hint_active = False
+            self.hint_piece = None
         
         time_elapsed = (current_time - self.start_time) // 1000
         self.game_state.time_remaining = max(0, DIFFICULTY_LEVELS[self.game_state.difficulty]['timer'] - time_elapsed)
@@ -148,11 +210,11 @@ class EncryptedRoom(BaseLevel):
             self.start_time = current_time
             return
             
-        for row in self.grid:
-            for piece in row:
-                if piece.locked and current_time - piece.lock_time > 1000:
-                    piece.locked = False
-                    self.terminal.add_message(">> Piece unlocked!")
+        for piece in self.locked_pieces[:]:
+            if current_time - piece.lock_time > 1000:
+                piece.locked = False
+                self.locked_pieces.remove(piece)
+                self.terminal.add_message(">> Piece unlocked!")
         
         for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN and not self.show_instructions:
@@ -160,76 +222,89 @@ class EncryptedRoom(BaseLevel):
                     self.hint_count += 1
                     self.hint_active = True
                     self.hint_timer = current_time
-                    self.hint_text = self.hints[min(self.hint_count - 1, len(self.hints) - 1)]
+                    suggestion = self.solver_hint()
+                    if suggestion is not None:
+                        row, col, clicks = suggestion
+                        self.hint_piece = self.grid[row][col]
+                        times = "once" if clicks == 1 else f"{clicks} times"
+                        self.hint_text = f"Rotate the piece at row {row + 1}, column {col + 1} {times}. It is outlined in yellow"
+                    else:
+                        self.hint_piece = None
+                        self.hint_text = self.hints[min(self.hint_count - 1, len(self.hints) - 1)]
                     self.sound_manager.play('terminal')
                     self.terminal.add_message(f">> Hint {self.hint_count}/{self.max_hints}: {self.hint_text}")
                 else:
-                    for row in range(self.grid_size):
-                        for col in range(self.grid_size):
-                            piece = self.grid[row][col]
-                            if piece.rect.collidepoint(event.pos) and not piece.locked:
-                                old_count, _ = self.check_connections()
-                                piece.rotate()
-                                self.sound_manager.play('terminal')
-                                new_count, is_complete = self.check_connections()
-                                if is_complete:
-                                    self.sound_manager.play('success')
-                                    self.sound_manager.play('power_up')
-                                    self.terminal.add_message(">> All connected! Vault unlocked!")
-                                    self.game_state.update_score(DIFFICULTY_LEVELS[self.game_state.difficulty]['score_reward'])
-                                    self.game_state.level_complete = True
-                                    self.flash_time = current_time
-                                elif new_count <= old_count:
-                                    piece.locked = True
-                                    piece.lock_time = current_time
-                                    self.sound_manager.play('error')
-                                    self.terminal.add_message(">> Oops! Piece locked for 1s.")
-                                else:
-                                    self.connected_count = new_count
-                                    self.sound_manager.play('hack')
-                                    self.terminal.add_message(f">> Nice! {new_count}/16 connected!")
-                                    self.progress_flash = current_time
+                    cell = self._piece_at(event.pos)
+                    if cell is None:
+                        continue
+                    row, col = cell
+                    piece = self.grid[row][col]
+                    if not piece.locked:
+                        old_count = self.board.count
+                        piece.rotate()
+                        self.sound_manager.play('terminal')
+                        with profiler.span('check_connections'):
+                            new_count, is_complete = self.board.rotate(row * self.grid_size + col)
+                        with profiler.span('link_overlay'):
+                            self.links.piece_rotated(row * self.grid_size + col)
+                        telemetry.emit(ROTATE, self.game_state, row * self.grid_size + col, new_count)
+                        if is_complete:
+                            self.sound_manager.play('success')
+                            self.sound_manager.play('power_up')
+                            self.terminal.add_message(">> All connected! Vault unlocked!")
+                            self.game_state.update_score(DIFFICULTY_LEVELS[self.game_state.difficulty]['score_reward'])
+                            self.game_state.level_complete = True
+                            self.flash_time = current_time
+                        elif new_count <= old_count:
+                            piece.locked = True
+                            piece.lock_time = current_time
+                            self.locked_pieces.append(piece)
+                            telemetry.emit(LOCK, self.game_state, row * self.grid_size + col)
+                            self.sound_manager.play('error')
+                            self.terminal.add_message(">> Oops! Piece locked for 1s.")
+                        else:
+                            self.connected_count = new_count
+                            self.sound_manager.play('hack')
+                            self.terminal.add_message(f">> Nice! {new_count}/{self.grid_size * self.grid_size} connected!")
+                            self.progress_flash = current_time
                             
+    def draw_background(self, surface):
+        pygame.draw.rect(surface, YELLOW, self.grid[0][0].rect, 4)
+
     def draw(self, screen):
-        screen.fill(BLACK)
-        
-        if self.game_state.level_complete and pygame.time.get_ticks() - self.flash_time < 500:
+        if self.game_state.level_complete and self.clock.ticks() - self.flash_time < 500:
             screen.fill(GREEN)
-        elif pygame.time.get_ticks() - self.progress_flash < 300:
+            self.draw_background(screen)
+            self.full_redraw = self.flashing = True
+        elif self.clock.ticks() - self.progress_flash < 300:
             screen.fill((0, 50, 0))
+            self.draw_background(screen)
+            self.full_redraw = self.flashing = True
+        else:
+            self.blit_background(screen)
+            if self.flashing:
+                # The flash covered the whole screen, push one more full frame to clear it
+                self.flashing = False
+                self.full_redraw = True
         
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                piece = self.grid[row][col]
-                if row == 0 and col == 0:
-                    pygame.draw.rect(screen, YELLOW, piece.rect, 4)
-                piece.draw(screen)
-        
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                piece = self.grid[row][col]
-                center = piece.rect.centerx, piece.rect.centery
-                size = self.piece_size // 2
-                for i, connected in enumerate(piece.connections):
-                    if connected:
-                        dr, dc = [(0, -1), (1, 0), (0, 1), (-1, 0)][i]
-                        new_row, new_col = row + dr, col + dc
-                        if (0 <= new_row < self.grid_size and 0 <= new_col < self.grid_size):
-                            next_piece = self.grid[new_row][new_col]
-                            opposite_dir = (i + 2) % 4
-                            if next_piece.connections[opposite_dir]:
-                                next_center = next_piece.rect.centerx, next_piece.rect.centery
-                                pulse_factor = (pygame.time.get_ticks() % PULSE_SPEED) / PULSE_SPEED
-                                pygame.draw.line(screen, CYAN, center, next_center, 5 + int(2 * pulse_factor))
+        ticks = self.clock.ticks()
+        sprites = []
+        for index, piece in enumerate(self.pieces):
+            piece.connected = self.board.is_connected(index)
+            sprites.append((self.atlas.sprite(self.board.masks[index], piece.state(), ticks, piece.pulse_offset), piece.rect))
+        screen.blits(sprites, False)
+        self.links.draw(screen, ticks)
+        if self.hint_piece is not None:
+            pygame.draw.rect(screen, YELLOW, self.hint_piece.rect.inflate(-6, -6), 3)
+        self.mark_dirty(self.grid[0][0].rect.union(self.grid[-1][-1].rect).inflate(8, 8))
         
-        self.terminal.draw(screen)
-        self.draw_score(screen)
+        self.draw_hud(screen)
         
         # Hint button
         pygame.draw.rect(screen, GREEN if self.hint_count < self.max_hints else RED, self.hint_button)
         pygame.draw.rect(screen, WHITE, self.hint_button, 2)
-        font = pygame.font.Font(None, 24)
-        hint_label = font.render("HINT", True, WHITE)
+        self.mark_dirty(self.hint_button)
+        hint_label = font_manager.render("HINT", 24, WHITE)
         screen.blit(hint_label, (self.hint_button.x + 15, self.hint_button.y + 5))
         
         # Hint popup
@@ -237,19 +312,19 @@ class EncryptedRoom(BaseLevel):
             popup_rect = pygame.Rect(WINDOW_WIDTH // 4, WINDOW_HEIGHT // 4, WINDOW_WIDTH // 2, 150)
             pygame.draw.rect(screen, (0, 0, 0, 180), popup_rect, 0, 10)  # Semi-transparent black
             pygame.draw.rect(screen, WHITE, popup_rect, 2)
-            hint_font = pygame.font.Font(None, 28)
             lines = self.hint_text.split('. ')
             y_offset = popup_rect.y + 20
             for line in lines:
                 if line:
-                    text_surface = hint_font.render(line.strip() + '.', True, WHITE)
+                    text_surface = font_manager.render(line.strip() + '.', 28, WHITE)
                     screen.blit(text_surface, (popup_rect.x + 20, y_offset))
                     y_offset += 30
+            self.mark_dirty(popup_rect)
         
         # Progress bar
-        font = pygame.font.Font(None, 36)
-        text = font.render(f"Level 2: Circuit Puzzle - Time: {self.game_state.time_remaining}s", True, YELLOW)
-        screen.blit(text, (10, 10))
+        text = font_manager.render(f"Level 2: Circuit Puzzle - Time: {self.game_state.time_remaining}s", 36, YELLOW)
+        self.mark_dirty(screen.blit(text, (10, 10)))
         progress_width = (WINDOW_WIDTH - 40) * (self.connected_count / (self.grid_size * self.grid_size))
         pygame.draw.rect(screen, GREEN, (20, WINDOW_HEIGHT - 20, progress_width, 10))
-        pygame.draw.rect(screen, WHITE, (20, WINDOW_HEIGHT - 20, WINDOW_WIDTH - 40, 10), 2)
\ No newline at end of file
+        pygame.draw.rect(screen, WHITE, (20, WINDOW_HEIGHT - 20, WINDOW_WIDTH - 40, 10), 2)
+        self.mark_dirty((20, WINDOW_HEIGHT - 20, WINDOW_WIDTH - 40, 10))
\ No newline at end of file
@@ -1,21 +1,62 @@
 import pygame
 import random
+import struct
 from levels.base_level import BaseLevel
 from config import *
+from font_manager import font_manager
+from snapshot import SnapshotReader
+from telemetry import telemetry, PATTERN
+from utils.level_specs import firewall_spec
+from utils.pattern_stream import PatternStream, PlaybackTimeline
+
+LAYOUT = struct.Struct('<B')  # endless, the stream itself comes back from the spec seed
+# show instructions, generating, rounds won, symbols shown, pattern start, pattern length, symbols matched,
+# playback start, instruction time, next classic pattern start
+STATE = struct.Struct('<BBIIQIIqqQ')
 
 class FirewallBreach(BaseLevel):
-    def __init__(self, game_state, sound_manager):
+    generate_spec = staticmethod(firewall_spec)
+
+    def __init__(self, game_state, sound_manager, spec=None, endless=FIREWALL_ENDLESS):
         super().__init__(game_state, sound_manager)
-        self.pattern = []
-        self.player_sequence = []
+        if spec is None:
+            spec = firewall_spec(game_state.difficulty, random.randrange(2 ** 32), endless)
+        self.seed = spec['seed']
+        self.endless = spec['endless']
+        self.stream = PatternStream(spec['seed'])
+        # The pattern is the stream window [pattern_start, pattern_start + pattern_length)
+        self.pattern_start = 0
+        self.pattern_length = 0
+        self.next_start = 0  # Classic rounds each take fresh symbols from here
+        self.progress = 0  # Symbols of the pattern matched so far
+        self.timeline = PlaybackTimeline(0, 0, FIREWALL_BLINK_MS)
         self.generating_pattern = False
-        self.display_time = 0
         self.current_pattern_index = 0
         self.buttons = self._create_buttons()
         self.show_instructions = True
-        self.instruction_time = pygame.time.get_ticks()
+        self.instruction_time = self.clock.ticks()
         self.correct_attempts = 0  # Track correct pattern entries
         
+    def snapshot(self):
+        return LAYOUT.pack(self.endless) + STATE.pack(
+            self.show_instructions, self.generating_pattern, self.correct_attempts, self.current_pattern_index,
+            self.pattern_start, self.pattern_length, self.progress, self.timeline.start, self.instruction_time,
+            self.next_start)
+
+    @classmethod
+    def from_snapshot(cls, game_state, sound_manager, seed, data):
+        reader = SnapshotReader(data)
+        endless, = reader.unpack(LAYOUT)
+        level = cls(game_state, sound_manager, spec=firewall_spec(game_state.difficulty, seed, bool(endless)))
+        (show_instructions, generating, level.correct_attempts, level.current_pattern_index, level.pattern_start,
+         level.pattern_length, level.progress, playback_start, level.instruction_time,
+         level.next_start) = reader.unpack(STATE)
+        level.show_instructions = bool(show_instructions)
+        level.generating_pattern = bool(generating)
+        level.timeline = PlaybackTimeline(playback_start, level.pattern_length, FIREWALL_BLINK_MS)
+        level.terminal.add_message(f">> Session restored: {level.correct_attempts} patterns matched.")
+        return level
+
     def _create_buttons(self):
         buttons = []
         colors = [RED, GREEN, BLUE, CYAN]
@@ -34,94 +75,119 @@ class FirewallBreach(BaseLevel):
         return buttons
         
     def generate_pattern(self):
-        pattern_length = DIFFICULTY_LEVELS[self.game_state.difficulty]['pattern_length']
-        self.pattern = [random.randint(0, 3) for _ in range(pattern_length)]
-        self.display_time = pygame.time.get_ticks()
+        # Classic rounds take fresh symbols, endless rounds replay the stream from its start and grow with each win
+        if self.endless:
+            self.pattern_start = 0
+            self.pattern_length = (DIFFICULTY_LEVELS[self.game_state.difficulty]['pattern_length'] +
+                                   self.correct_attempts * FIREWALL_ENDLESS_GROWTH)
+        else:
+            self.pattern_start = self.next_start
+            self.pattern_length = DIFFICULTY_LEVELS[self.game_state.difficulty]['pattern_length']
+            self.next_start += self.pattern_length
+        self.progress = 0
+        self.generating_pattern = True
         self.current_pattern_index = 0
-        self.terminal.add_message(f">> Pattern length: {pattern_length}. Watch carefully!")
+        self.timeline = PlaybackTimeline(self.clock.ticks(), self.pattern_length, FIREWALL_BLINK_MS)
+        self.terminal.add_message(f">> Pattern length: {self.pattern_length}. Watch carefully!")
         self.sound_manager.play('scan')
+
+    def expected_symbol(self):
+        # Button the next tap has to hit
+        return self.stream.symbol(self.pattern_start + self.progress)
         
     def update(self, events):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.ticks()
         
         if self.show_instructions:
             if current_time - self.instruction_time > 7000:
                 self.show_instructions = False
-                self.terminal.add_message(">> Watch the boxes blink. Click them in order 3 times to win!")
-                self.generating_pattern = True
+                if self.endless:
+                    self.terminal.add_message(">> Endless mode! The pattern grows every round. Don't miss!")
+                else:
+                    self.terminal.add_message(">> Watch the boxes blink. Click them in order 3 times to win!")
                 self.generate_pattern()
             return
             
         if self.generating_pattern:
-            if self.current_pattern_index < len(self.pattern):
-                if current_time - self.display_time > 1500:  # Slower blink (1.5s)
-                    self.current_pattern_index += 1
-                    self.sound_manager.play('terminal')
-                    self.display_time = current_time
-            else:
+            shown = self.timeline.index_at(current_time)
+            if shown > self.current_pattern_index:
+                self.current_pattern_index = shown
+                self.sound_manager.play('terminal')
+            if self.timeline.finished(current_time):
                 self.generating_pattern = False
-                self.terminal.add_message(f">> Your turn! Match the pattern ({self.correct_attempts + 1}/3).")
+                if self.endless:
+                    self.terminal.add_message(f">> Your turn! Round {self.correct_attempts + 1}.")
+                else:
+                    self.terminal.add_message(f">> Your turn! Match the pattern ({self.correct_attempts + 1}/3).")
             return
                 
         for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN and not self.generating_pattern:
                 for button in self.buttons:
                     if button['rect'].collidepoint(event.pos):
-                        self.player_sequence.append(button['index'])
                         self.sound_manager.play('terminal')
-                        self.terminal.add_message(f">> Tap {len(self.player_sequence)}/{len(self.pattern)}")
-                        
-                        if len(self.player_sequence) == len(self.pattern):
-                            if self.player_sequence == self.pattern:
-                                self.correct_attempts += 1
-                                self.sound_manager.play('success')
+                        # Every tap is checked on its own, a wrong one fails the round straight away
+                        if button['index'] != self.expected_symbol():
+                            telemetry.emit(PATTERN, self.game_state, 0, self.pattern_length)
+                            self.sound_manager.play('error')
+                            self.terminal.add_message(f">> Wrong at tap {self.progress + 1}! Try again.")
+                            self.game_state.lose_life()
+                            self.terminal.add_message(f">> Lives remaining: {self.game_state.lives}")
+                            self.generate_pattern()
+                            break
+                        self.progress += 1
+                        self.terminal.add_message(f">> Tap {self.progress}/{self.pattern_length}")
+                        if self.progress == self.pattern_length:
+                            telemetry.emit(PATTERN, self.game_state, 1, self.pattern_length)
+                            self.correct_attempts += 1
+                            self.sound_manager.play('success')
+                            if self.endless:
+                                self.terminal.add_message(f">> Correct! Round {self.correct_attempts} cleared.")
+                                self.game_state.update_score(DIFFICULTY_LEVELS[self.game_state.difficulty]['score_reward'])
+                                self.generate_pattern()
+                            elif self.correct_attempts >= 3:
                                 self.terminal.add_message(f">> Correct! ({self.correct_attempts}/3)")
-                                if self.correct_attempts >= 3:
-                                    self.sound_manager.play('hack')
-                                    self.terminal.add_message(">> Firewall breached! On to Level 2!")
-                                    self.game_state.update_score(DIFFICULTY_LEVELS[self.game_state.difficulty]['score_reward'] * 3)
-                                    self.game_state.level_complete = True
-                                else:
-                                    self.player_sequence = []
-                                    self.generating_pattern = True
-                                    self.generate_pattern()
+                                self.sound_manager.play('hack')
+                                self.terminal.add_message(">> Firewall breached! On to Level 2!")
+                                self.game_state.update_score(DIFFICULTY_LEVELS[self.game_state.difficulty]['score_reward'] * 3)
+                                self.game_state.level_complete = True
                             else:
-                                self.sound_manager.play('error')
-                                self.terminal.add_message(">> Wrong! Try again.")
-                                self.player_sequence = []
-                                self.game_state.lose_life()
-                                self.terminal.add_message(f">> Lives remaining: {self.game_state.lives}")
-                                self.generating_pattern = True
-                                self.display_time = current_time
-                                self.current_pattern_index = 0
+                                self.terminal.add_message(f">> Correct! ({self.correct_attempts}/3)")
                                 self.generate_pattern()
+                        break
                                 
+    def draw_background(self, surface):
+        for button in self.buttons:
+            pygame.draw.rect(surface, button['color'], button['rect'])
+            pygame.draw.rect(surface, WHITE, button['rect'], 2)
+
     def draw(self, screen):
-        screen.fill(BLACK)
+        self.blit_background(screen)
         
         for i, button in enumerate(self.buttons):
             base_color = button['color']
             base_rect = button['rect']
             
-            if self.generating_pattern and self.current_pattern_index > 0 and i == self.pattern[self.current_pattern_index - 1]:
-                pulse_factor = (pygame.time.get_ticks() % 800) / 800  # Slower pulse (800ms)
+            if (self.generating_pattern and self.current_pattern_index > 0 and
+                    i == self.stream.symbol(self.pattern_start + self.current_pattern_index - 1)):
+                pulse_factor = (self.clock.ticks() % 800) / 800  # Slower pulse (800ms)
                 brightness_boost = int(150 * pulse_factor)
                 color = tuple(min(255, c + brightness_boost) for c in base_color)
                 enlarged_rect = base_rect.inflate(int(30 * pulse_factor), int(30 * pulse_factor))
                 pygame.draw.rect(screen, color, enlarged_rect)
                 pygame.draw.rect(screen, WHITE, enlarged_rect, 3)
                 pygame.draw.rect(screen, YELLOW, enlarged_rect, 5)
-            else:
-                pygame.draw.rect(screen, base_color, base_rect)
-                pygame.draw.rect(screen, WHITE, base_rect, 2)
+                self.mark_dirty(base_rect.inflate(30, 30))
             
-        self.terminal.draw(screen)
-        self.draw_score(screen)
+        self.draw_hud(screen)
         
-        font = pygame.font.Font(None, 36)
-        text = font.render("Level 1: Firewall Breach", True, YELLOW)
-        screen.blit(text, (10, 10))
+        if self.endless:
+            text = font_manager.render(f"Level 1: Endless Firewall - Round {self.correct_attempts + 1}", 36, YELLOW)
+            self.mark_dirty(screen.blit(text, (10, 10)))
+        else:
+            text = font_manager.render("Level 1: Firewall Breach", 36, YELLOW)
+            screen.blit(text, (10, 10))
         
         if self.generating_pattern and self.current_pattern_index > 0:
-            progress_text = font.render(f"Blink {self.current_pattern_index}/{len(self.pattern)}", True, WHITE)
-            screen.blit(progress_text, (WINDOW_WIDTH - 200, 10))
\ No newline at end of file
+            progress_text = font_manager.render(f"Blink {self.current_pattern_index}/{self.pattern_length}", 36, WHITE)
+            self.mark_dirty(screen.blit(progress_text, (WINDOW_WIDTH - 200, 10)))
\ No newline at end of file
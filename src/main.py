@@ -1,6 +1,10 @@
 import pygame
 import sys
 import os
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Ensure correct path for imports
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,166 +16,179 @@ except ModuleNotFoundError as e:
     print(f"ERROR: Could not import config.py! ({e})")
     sys.exit(1) # Now this should work!
 from game_state import GameState
+from game_io import VirtualClock
 
 from sound_manager import SoundManager
+from renderer import DirtyRectRenderer
+from display import Display
+from profiler import profiler
+from scenes import MenuScene
+from level_generator import LevelGenerator
+import snapshot
 from levels.firewall_breach import FirewallBreach
 from levels.encrypted_room import EncryptedRoom
 from levels.ai_showdown import AIShowdown
+from replay import InputRecorder
+from telemetry import telemetry, TELEMETRY_PATH
+
+LEVELS = [FirewallBreach, EncryptedRoom, AIShowdown]
 
 class Game:
-    def __init__(self):
+    def __init__(self, recorder=None, telemetry_path=None, tier=RENDER_TIER, fullscreen=DISPLAY_FULLSCREEN):
+        self.levels = LEVELS
+        self.generator = LevelGenerator(self.levels)
+        if telemetry_path or TELEMETRY_ENABLED:
+            telemetry.start(telemetry_path or TELEMETRY_PATH)  # After the pool forks, its workers need no writer thread
         pygame.init()
         pygame.mixer.init()
         
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.display = Display(tier=tier, fullscreen=fullscreen)
         pygame.display.set_caption("Code Breaker: Cyber Heist")
         
         self.clock = pygame.time.Clock()
-        self.game_state = GameState()
+        # Levels see simulated time, advanced one fixed step per update by LevelScene
+        self.sim_clock = VirtualClock(pygame.time.get_ticks())
+        self.step_ms = 1000 / SIMULATION_HZ
+        self.renderer = DirtyRectRenderer(self.display)
+        self.game_state = GameState(self.sim_clock)
+        self.generator.prefetch(self.game_state.difficulty)
         self.sound_manager = SoundManager()
-        self.sound_manager.sounds['success'].set_volume(0.2)
-        self.sound_manager.sounds['success'].play(loops=-1)  # Background ambiance
-        
-        self.levels = [FirewallBreach, EncryptedRoom, AIShowdown]
-        self.current_level = None
-        self.show_start_screen()
-        
-    def show_start_screen(self):
-        self.screen.fill(BLACK)
-        title_font = pygame.font.Font(None, 74)
-        menu_font = pygame.font.Font(None, 36)
-        
-        title = title_font.render("Code Breaker: Cyber Heist", True, CYAN)
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 4))
-        pulse_factor = (pygame.time.get_ticks() % PULSE_SPEED) / PULSE_SPEED
-        title_rect.y += int(10 * pulse_factor)
-        self.screen.blit(title, title_rect)
-        
-        difficulties = ['Easy', 'Medium', 'Hard']
-        button_height = 50
-        spacing = 20
-        selected = difficulties.index(self.game_state.difficulty.title())
-        
-        for i, diff in enumerate(difficulties):
-            button_rect = pygame.Rect(
-                WINDOW_WIDTH // 4,
-                WINDOW_HEIGHT // 2 + i * (button_height + spacing),
-                WINDOW_WIDTH // 2,
-                button_height
-            )
-            color = GREEN if i == selected else WHITE
-            pygame.draw.rect(self.screen, color, button_rect, 2)
-            
-            text = menu_font.render(diff, True, color)
-            text_rect = text.get_rect(center=button_rect.center)
-            self.screen.blit(text, text_rect)
-            
-        start_text = menu_font.render("Press SPACE to Start", True, WHITE)
-        start_rect = start_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT * 3 // 4))
-        self.screen.blit(start_text, start_rect)
-        
-        pygame.display.flip()
-        
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        waiting = False
-                        self.init_level()
-                    elif event.key == pygame.K_UP:
-                        selected = (selected - 1) % len(difficulties)
-                        self.game_state.difficulty = difficulties[selected].lower()
-                        self.show_start_screen()
-                    elif event.key == pygame.K_DOWN:
-                        selected = (selected + 1) % len(difficulties)
-                        self.game_state.difficulty = difficulties[selected].lower()
-                        self.show_start_screen()
-                        
-    def init_level(self):
-        level_class = self.levels[self.game_state.current_level]
-        self.current_level = level_class(self.game_state, self.sound_manager)
-        self.sound_manager.play('portal')
-        
-    def show_game_over_screen(self):
-        self.sound_manager.sounds['ambient'].stop()
-        self.screen.fill(BLACK)
-        
-        title_font = pygame.font.Font(None, 64)
-        if self.game_state.current_level == len(self.levels) - 1 and self.game_state.level_complete:
-            text = title_font.render("Mission Complete!", True, GREEN)
-            self.sound_manager.play('success')
-        else:
-            text = title_font.render("Mission Failed", True, RED)
-            self.sound_manager.play('alert')
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3))
-        self.screen.blit(text, text_rect)
-        
-        score_font = pygame.font.Font(None, 48)
-        score_text = score_font.render(f"Score: {self.game_state.score}", True, WHITE)
-        score_rect = score_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        self.screen.blit(score_text, score_rect)
-        
-        inst_font = pygame.font.Font(None, 36)
-        inst_text = inst_font.render("Press R to Restart or Q to Quit", True, WHITE)
-        inst_rect = inst_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT * 2 // 3))
-        self.screen.blit(inst_text, inst_rect)
-        
-        pygame.display.flip()
-        
-    def show_level_transition(self):
-        self.screen.fill(BLACK)
-        font = pygame.font.Font(None, 48)
-        level_names = ["Firewall Breach", "Encrypted Room", "AI Showdown"]
-        text = font.render(f"Level {self.game_state.current_level + 1}: {level_names[self.game_state.current_level]}", True, GREEN)
-        text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        
-        self.screen.blit(text, text_rect)
-        self.sound_manager.play('hack')
-        pygame.display.flip()
-        pygame.time.wait(2000)  # Show transition for 2 seconds
-        
+        self.sound_manager.play_loop('ambient', volume=0.2)  # Background ambiance, starts once it has loaded
+        
+        self.recorder = recorder
+        self.autosave = snapshot.AutosaveWriter()
+        # Levels are built here while their transition plays, so starting one never stalls a frame
+        self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-loader')
+        self.scenes = []
+        self.push(MenuScene(self))
+
+    def push(self, scene):
+        self.scenes.append(scene)
+        scene.enter()
+
+    def switch(self, scene):
+        self.scenes.pop()
+        self.push(scene)
+
+    def reset(self, scene):
+        self.scenes = []
+        self.push(scene)
+
+    def preload_level(self, index):
+        # Each level's content comes from a seed so recordings can rebuild the same patterns and boards
+        seed, spec = self.generator.take(index, self.game_state.difficulty)
+        if self.recorder:
+            self.recorder.level(index, self.game_state.difficulty, seed, self.sim_clock.now)
+        return self.loader.submit(self._build_level, index, seed, spec)
+
+    def _build_level(self, index, seed, spec):
+        # Runs on the loader thread, nothing on the main thread uses random or the game state until it is done
+        random.seed(seed)
+        return self.levels[index](self.game_state, self.sound_manager, spec=spec.get())
+
+    def save(self, level):
+        # Serialising happens here, the file write on the autosave thread
+        with profiler.span('autosave'):
+            self.autosave.save(snapshot.dump(self.game_state, self.sim_clock, level))
+
+    def restore(self):
+        # Returns (level index, future of the rebuilt level) for the autosave, None without a usable one
+        data = self.autosave.load()
+        if data is None:
+            return None
+        try:
+            game_state, index, seed, now, level_data = snapshot.read(data, self.sim_clock)
+        except ValueError as e:
+            self.discard_autosave(e)
+            return None
+        self.game_state = game_state
+        self.sim_clock.now = now
+        self.generator.prefetch(game_state.difficulty)
+        return index, self.loader.submit(self._restore_level, index, seed, level_data)
+
+    def discard_autosave(self, error):
+        print(f"Warning: Discarding autosave: {error}")
+        self.autosave.delete()
+
+    def _restore_level(self, index, seed, level_data):
+        random.seed(seed)  # Same as _build_level, so pieces get the pulse offsets they had before
+        return self.levels[index].from_snapshot(self.game_state, self.sound_manager, seed, level_data)
+
+    def quit(self):
+        if self.recorder:
+            self.recorder.close(self.game_state)
+        if self.scenes and self.scenes[-1].level:
+            self.save(self.scenes[-1].level)  # Quitting mid-level keeps the place
+        self.autosave.close()
+        telemetry.close()
+        self.loader.shutdown(cancel_futures=True)  # Let a level that is mid-build finish before pygame goes
+        self.generator.close()
+        pygame.quit()
+        sys.exit()
+
+    def export_trace(self):
+        trace_dir = os.path.join(CACHE_DIR, 'traces')
+        path = os.path.join(trace_dir, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        level = self.scenes[-1].level
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+            count = profiler.export_chrome_trace(path)
+        except OSError as e:
+            print(f"Warning: Could not write trace {path}: {e}")
+            if level:
+                level.terminal.add_message(">> Trace export failed")
+            return
+        print(f"Wrote {count} trace events to {path}")
+        if level:
+            level.terminal.add_message(f">> Trace saved ({count} events)")
+
     def run(self):
+        frame_ms = 0
         while True:
-            events = pygame.event.get()
+            profiler.begin_frame()
+            with profiler.span('events'):
+                events = self.display.translate(pygame.event.get())
             for event in events:
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN and (self.game_state.game_over or 
-                    (self.game_state.current_level == len(self.levels) - 1 and self.game_state.level_complete)):
-                    if event.key == pygame.K_r:
-                        self.game_state = GameState()
-                        self.sound_manager.sounds['ambient'].play(loops=-1)
-                        self.show_start_screen()
-                    elif event.key == pygame.K_q:
-                        pygame.quit()
-                        sys.exit()
-                        
-            if self.game_state.game_over or (self.game_state.current_level == len(self.levels) - 1 and 
-                self.game_state.level_complete):
-                self.show_game_over_screen()
-            else:
-                # Update and draw current level
-                self.current_level.update(events)
-                self.current_level.draw(self.screen)
-                
-                # Handle level completion and transition
-                if self.game_state.level_complete:
-                    if self.game_state.current_level < len(self.levels) - 1:
-                        self.show_level_transition()  # Show transition before incrementing
-                        self.game_state.next_level()  # Move to next level
-                        self.init_level()  # Initialize the new level
-                    else:
-                        # If on the last level and completed, show game over
-                        self.game_state.level_complete = False  # Reset to avoid loop
-
-            pygame.display.flip()
-            self.clock.tick(FPS)
+                    self.quit()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                    self.renderer.toggle()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.renderer.toggle_overlay()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    profiler.toggle_overlay()
+                    self.renderer.invalidate()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    self.export_trace()
+                elif self.scenes[-1].level and event.type == pygame.MOUSEWHEEL:
+                    self.scenes[-1].level.terminal.scroll(event.y * 3)
+                elif self.scenes[-1].level and event.type == pygame.KEYDOWN and event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                    terminal = self.scenes[-1].level.terminal
+                    terminal.scroll(terminal.visible_lines if event.key == pygame.K_PAGEUP else -terminal.visible_lines)
+
+            # The scene may hand over to another one, which then draws this frame
+            self.scenes[-1].update(events, frame_ms)
+            scene = self.scenes[-1]
+            screen = self.display.framebuffer
+            with profiler.span('draw'):
+                scene.draw(screen)
+
+            if profiler.show_overlay:
+                panel = profiler.draw(screen)
+                if scene.level:
+                    scene.level.mark_dirty(panel)
+            with profiler.span('present'):
+                self.renderer.present(scene.level)
+            with profiler.span('wait'):
+                frame_ms = self.clock.tick(FPS)
+            profiler.end_frame()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Code Breaker: Cyber Heist")
+    parser.add_argument('--record', metavar='LOG', help="record inputs and seeds for replay.py")
+    parser.add_argument('--telemetry', metavar='LOG', help="append gameplay events to LOG, see telemetry.py")
+    parser.add_argument('--tier', choices=list(RENDER_TIERS), default=RENDER_TIER, help="how frames are scaled to the window")
+    parser.add_argument('--fullscreen', action='store_true', default=DISPLAY_FULLSCREEN)
+    args = parser.parse_args()
+    game = Game(InputRecorder(args.record) if args.record else None, args.telemetry, args.tier, args.fullscreen)
     game.run()
\ No newline at end of file
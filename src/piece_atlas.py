@@ -0,0 +1,85 @@
+import pygame
+from config import *
+from utils.circuit_board import DIRECTIONS
+
+IDLE, CONNECTED, LOCKED = 0, 1, 2
+
+class PieceAtlas:
+    def __init__(self, piece_size):
+        # One sprite per (connection mask, state, pulse phase), a mask already covers type and rotation
+        self.piece_size = piece_size
+        self.sprites = [[[self._render(mask, state, phase) for phase in range(PULSE_PHASES)]
+                         for state in (IDLE, CONNECTED, LOCKED)] for mask in range(16)]
+
+    def _render(self, mask, state, phase):
+        size = self.piece_size
+        pulse_factor = phase / PULSE_PHASES
+        surface = pygame.Surface((size, size)).convert()
+        surface.fill(BLACK)
+        surface.set_colorkey(BLACK)
+
+        size_offset = int(5 * pulse_factor) if state != LOCKED else 0
+        color = (WHITE, BLUE, RED)[state]
+        pygame.draw.rect(surface, color, pygame.Rect(0, 0, size, size).inflate(-size_offset, -size_offset), 2)
+
+        line_color = (GREEN, CYAN, RED)[state]
+        center = size // 2, size // 2
+        for i, (dr, dc) in enumerate(DIRECTIONS):
+            if mask & (1 << i):
+                end = center[0] + dc * (size // 2), center[1] + dr * (size // 2)
+                pygame.draw.line(surface, line_color, center, end, 3 + int(2 * pulse_factor))
+        return surface
+
+    def sprite(self, mask, state, ticks, pulse_offset):
+        phase = (ticks + pulse_offset) % PULSE_SPEED * PULSE_PHASES // PULSE_SPEED
+        return self.sprites[mask][state][phase]
+
+class LinkOverlay:
+    def __init__(self, board, origin, piece_size):
+        # Cyan lines between linked piece centres, one surface per line width, patched around rotated pieces
+        self.board = board
+        self.origin = origin
+        self.piece_size = piece_size
+        extent = board.size * piece_size
+        self.surfaces = []
+        for _ in range(2):
+            surface = pygame.Surface((extent, extent)).convert()
+            surface.set_colorkey(BLACK)
+            self.surfaces.append(surface)
+        self.redraw(0, 0, board.size)
+
+    def redraw(self, first_row, first_col, count):
+        # Redraw every link that can reach into a block of pieces. Lines are drawn unclipped on a
+        # scratch surface and only the block is copied back, clipping would shift thick line pixels
+        size = self.board.size
+        piece_size = self.piece_size
+        half = piece_size // 2
+        # Thick lines spill a few pixels past their ends, small pieces need a wider ring of neighbours
+        margin = 1 + 6 // piece_size
+        rows = range(max(0, first_row - margin), min(size, first_row + count + margin))
+        cols = range(max(0, first_col - margin), min(size, first_col + count + margin))
+        left, top = cols.start * piece_size, rows.start * piece_size
+        area = pygame.Rect(first_col * piece_size, first_row * piece_size, count * piece_size, count * piece_size)
+        scratch = pygame.Surface((len(cols) * piece_size, len(rows) * piece_size)).convert()
+        for width, surface in enumerate(self.surfaces, 5):
+            scratch.fill(BLACK)
+            for row in rows:
+                for col in cols:
+                    index = row * size + col
+                    for other in self.board.neighbors(index):
+                        other_row, other_col = divmod(other, size)
+                        # Links inside the range are drawn once, from their lower index
+                        if other > index or other_row not in rows or other_col not in cols:
+                            pygame.draw.line(scratch, CYAN,
+                                             (col * piece_size + half - left, row * piece_size + half - top),
+                                             (other_col * piece_size + half - left, other_row * piece_size + half - top),
+                                             width)
+            surface.blit(scratch, area, area.move(-left, -top))
+
+    def piece_rotated(self, index):
+        row, col = divmod(index, self.board.size)
+        self.redraw(row - 1, col - 1, 3)
+
+    def draw(self, screen, ticks):
+        pulse_factor = (ticks % PULSE_SPEED) / PULSE_SPEED
+        screen.blit(self.surfaces[int(2 * pulse_factor)], self.origin)
@@ -0,0 +1,177 @@
+import gc
+import json
+import time
+from array import array
+from collections import deque
+import pygame
+from config import *
+from font_manager import font_manager
+
+PHASES = ('events', 'update', 'draw', 'present', 'wait')
+PHASE_COLORS = {'events': WHITE, 'update': GREEN, 'draw': CYAN, 'present': YELLOW, 'wait': (60, 60, 60)}
+BUCKET_EDGES = (0.004, 0.008, 0.0167, 0.025, 0.0333, 0.05)  # Frame time histogram bucket limits in seconds
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+class FrameProfiler:
+    def __init__(self, capacity=PROFILER_FRAMES):
+        self.capacity = capacity
+        self.enabled = False
+        self.show_overlay = False
+        # Ring buffers over the last `capacity` frames, with a histogram kept in step
+        self.totals = array('d', [0.0]) * capacity
+        self.phases = {name: array('d', [0.0]) * capacity for name in PHASES}
+        self.buckets = [0] * (len(BUCKET_EDGES) + 1)
+        self.index = 0
+        self.count = 0
+        self.current = {}
+        self.last_frame = {}
+        self.frame_start = None
+        self.trace = deque(maxlen=capacity * 32)  # (name, start, duration) for trace export
+        self.gc_pauses = deque(maxlen=64)
+        self.gc_start = None
+        self.origin = time.perf_counter()
+        self.set_enabled(PROFILER_ENABLED)
+
+    def set_enabled(self, enabled):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        self.frame_start = None
+        if enabled:
+            gc.callbacks.append(self._on_gc)
+        else:
+            gc.callbacks.remove(self._on_gc)
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.set_enabled(self.show_overlay or PROFILER_ENABLED)
+
+    def span(self, name):
+        # Disabled profiling hands out one shared no-op context manager
+        return _Span(self, name) if self.enabled else NULL_SPAN
+
+    def record(self, name, start, end):
+        duration = end - start
+        self.current[name] = self.current.get(name, 0.0) + duration
+        self.trace.append((name, start, duration))
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            end = time.perf_counter()
+            self.gc_pauses.append(end - self.gc_start)
+            self.record(f"gc gen{info['generation']}", self.gc_start, end)
+            self.gc_start = None
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+            self.current = {}
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        end = time.perf_counter()
+        total = end - self.frame_start
+        self.trace.append(('frame', self.frame_start, total))
+
+        i = self.index
+        if self.count == self.capacity:
+            self.buckets[self._bucket(self.totals[i])] -= 1
+        else:
+            self.count += 1
+        self.totals[i] = total
+        self.buckets[self._bucket(total)] += 1
+        for name in PHASES:
+            self.phases[name][i] = self.current.get(name, 0.0)
+        self.index = (i + 1) % self.capacity
+        self.last_frame = self.current
+
+    def _bucket(self, seconds):
+        for i, edge in enumerate(BUCKET_EDGES):
+            if seconds < edge:
+                return i
+        return len(BUCKET_EDGES)
+
+    def recent(self, count):
+        # Ring indices of the last `count` frames, oldest first
+        count = min(count, self.count)
+        return [(self.index - count + k) % self.capacity for k in range(count)]
+
+    def draw(self, screen):
+        # Frame graph stacked by phase, worst frame, histogram and GC pauses; returns the panel rect
+        graph_frames = 150
+        panel = pygame.Rect(screen.get_width() - graph_frames - 30, 90, graph_frames + 20, 230)
+        pygame.draw.rect(screen, BLACK, panel)
+        pygame.draw.rect(screen, WHITE, panel, 1)
+        graph_bottom = panel.y + 70
+        scale = 60 / 0.0333  # 33 ms fills the graph
+        for x, i in enumerate(self.recent(graph_frames)):
+            y = graph_bottom
+            for name in PHASES:
+                height = min(y - panel.y - 5, round(self.phases[name][i] * scale))
+                if height > 0:
+                    pygame.draw.line(screen, PHASE_COLORS[name], (panel.x + 10 + x, y), (panel.x + 10 + x, y - height))
+                    y -= height
+        budget_y = graph_bottom - round(scale / FPS)
+        pygame.draw.line(screen, RED, (panel.x + 5, budget_y), (panel.right - 5, budget_y))
+
+        frames = [self.totals[i] for i in self.recent(self.count)]
+        worst = max(frames) if frames else 0.0
+        histogram = " ".join(str(n) for n in self.buckets)
+        pauses = list(self.gc_pauses)
+        lines = [
+            f"worst {worst * 1000:.1f} ms of {len(frames)}",
+            f"hist {histogram}",
+            f"gc {len(pauses)} max {max(pauses) * 1000 if pauses else 0:.1f} ms",
+        ]
+        spans = sorted(self.last_frame.items(), key=lambda item: -item[1])[:4]
+        lines.extend(f"{name} {seconds * 1000:.2f}" for name, seconds in spans)
+        y = graph_bottom + 8
+        for line in lines:
+            screen.blit(font_manager.render(line, 20, WHITE), (panel.x + 6, y))
+            y += 20
+        return panel
+
+    def export_chrome_trace(self, path):
+        # Chrome trace-event JSON, open in chrome://tracing or Perfetto
+        # The GC callback appends to the trace, so copy it with collection paused
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            trace = list(self.trace)
+        finally:
+            if was_enabled:
+                gc.enable()
+        events = [{'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                   'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6}
+                  for name, start, duration in trace]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+profiler = FrameProfiler()
@@ -0,0 +1,65 @@
+import pygame
+from config import *
+from font_manager import font_manager
+
+class DirtyRectRenderer:
+    def __init__(self, display):
+        self.display = display
+        self.enabled = DIRTY_RECT_RENDERING
+        self.show_overlay = SHOW_DIRTY_RECTS
+        self.previous_rects = []
+        self.force_full = True
+        self.pixels_pushed = 0
+
+    def invalidate(self):
+        self.force_full = True
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.force_full = True
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.force_full = True
+
+    @property
+    def screen(self):
+        return self.display.framebuffer
+
+    def present(self, level=None):
+        screen_rect = self.screen.get_rect()
+        rects = level.get_dirty_rects() if level else []
+
+        if not self.enabled or level is None or self.force_full or level.full_redraw:
+            if level:
+                level.full_redraw = False
+            self.force_full = level is None  # Menus draw outside the level, so redraw fully on return
+            self.previous_rects = rects
+            self.pixels_pushed = screen_rect.width * screen_rect.height
+            self.display.present()
+            return
+
+        # Regions drawn last frame must be pushed too so moved sprites get erased
+        update_rects = []
+        seen = set()
+        for rect in rects + self.previous_rects:
+            rect = rect.clip(screen_rect)
+            key = tuple(rect)
+            if rect.width and rect.height and key not in seen:
+                seen.add(key)
+                update_rects.append(rect)
+        self.previous_rects = rects
+        self.pixels_pushed = sum(rect.width * rect.height for rect in update_rects)
+
+        if self.show_overlay:
+            update_rects.extend(self._draw_overlay(update_rects, screen_rect))
+        self.display.present(update_rects)
+
+    def _draw_overlay(self, update_rects, screen_rect):
+        for rect in update_rects:
+            pygame.draw.rect(self.screen, (255, 0, 255), rect, 1)
+        percent = 100 * self.pixels_pushed / (screen_rect.width * screen_rect.height)
+        text = font_manager.render(f"Dirty: {len(update_rects)} rects, {percent:.1f}% px", 24, (255, 0, 255))
+        text_rect = self.screen.blit(text, (screen_rect.width - text.get_width() - 10, screen_rect.height - 40))
+        self.previous_rects.append(text_rect)
+        return [text_rect]
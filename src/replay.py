@@ -0,0 +1,211 @@
+import os
+import sys
+import gzip
+import time
+import struct
+import random
+import argparse
+
+import pygame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
+
+from config import *
+from game_state import GameState
+from game_io import VirtualClock, VirtualKeyboard
+from sound_manager import SoundManager
+
+# Log layout (gzip compressed): header, then tagged records
+#   b'L' level start: level index, difficulty index, seed of the level spec and random, simulation clock
+#   b'S' step: held key mask, event count, events
+#   b'I' run of idle steps (no events, same keys as the previous step): count
+#   b'E' end of session: final score and lives
+MAGIC = b'CBRP'
+VERSION = 3  # 2: seeds build level specs (utils.level_specs), 3: firewall patterns from a PatternStream
+HEADER = struct.Struct('<4sBH')
+LEVEL = struct.Struct('<BBId')
+STEP = struct.Struct('<HB')
+IDLE = struct.Struct('<I')
+END = struct.Struct('<ii')
+KEY_EVENT = struct.Struct('<I')
+MOUSE_EVENT = struct.Struct('<Bhh')
+
+DIFFICULTIES = list(DIFFICULTY_LEVELS)
+# Keys levels poll through get_pressed(), each gets a bit in the step key mask
+RECORDED_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d,
+                 pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)
+EVENT_TYPES = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+class InputRecorder:
+    def __init__(self, path):
+        self.file = gzip.open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, SIMULATION_HZ))
+        self.last_mask = 0
+        self.idle = 0
+
+    def level(self, index, difficulty, seed, sim_time):
+        self._flush_idle()
+        self.file.write(b'L' + LEVEL.pack(index, DIFFICULTIES.index(difficulty), seed, sim_time))
+
+    def step(self, events, keys):
+        mask = 0
+        for bit, key in enumerate(RECORDED_KEYS):
+            if keys[key]:
+                mask |= 1 << bit
+        events = [event for event in events if event.type in EVENT_TYPES]
+        if not events and mask == self.last_mask:
+            self.idle += 1
+            return
+        self._flush_idle()
+        self.last_mask = mask
+        self.file.write(b'S' + STEP.pack(mask, len(events)))
+        for event in events:
+            kind = EVENT_TYPES.index(event.type)
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                self.file.write(bytes([kind]) + KEY_EVENT.pack(event.key))
+            else:
+                self.file.write(bytes([kind]) + MOUSE_EVENT.pack(event.button, *event.pos))
+
+    def _flush_idle(self):
+        if self.idle:
+            self.file.write(b'I' + IDLE.pack(self.idle))
+            self.idle = 0
+
+    def close(self, game_state):
+        self._flush_idle()
+        self.file.write(b'E' + END.pack(game_state.score, game_state.lives))
+        self.file.close()
+
+def _read(file, layout):
+    data = file.read(layout.size)
+    if len(data) != layout.size:
+        raise ValueError("Truncated replay log")
+    return layout.unpack(data)
+
+def read_log(path):
+    # Yields ('level', ...), ('step', mask, events), ('idle', count) and ('end', score, lives)
+    with gzip.open(path, 'rb') as file:
+        magic, version, hz = _read(file, HEADER)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} replay log: {path}")
+        if hz != SIMULATION_HZ:
+            raise ValueError(f"Log was recorded at {hz} Hz, the game now steps at {SIMULATION_HZ} Hz")
+        while True:
+            tag = file.read(1)
+            if not tag:
+                return
+            if tag == b'L':
+                index, difficulty, seed, sim_time = _read(file, LEVEL)
+                yield 'level', index, DIFFICULTIES[difficulty], seed, sim_time
+            elif tag == b'S':
+                mask, count = _read(file, STEP)
+                events = []
+                for _ in range(count):
+                    kind = file.read(1)[0]
+                    event_type = EVENT_TYPES[kind]
+                    if event_type in (pygame.KEYDOWN, pygame.KEYUP):
+                        key, = _read(file, KEY_EVENT)
+                        events.append(pygame.event.Event(event_type, key=key, mod=0))
+                    else:
+                        button, x, y = _read(file, MOUSE_EVENT)
+                        events.append(pygame.event.Event(event_type, button=button, pos=(x, y)))
+                yield 'step', mask, events
+            elif tag == b'I':
+                yield 'idle', _read(file, IDLE)[0]
+            elif tag == b'E':
+                yield ('end',) + _read(file, END)
+            else:
+                raise ValueError(f"Corrupt replay log, unknown record {tag!r}")
+
+class Replayer:
+    def __init__(self, path, levels, sound_manager=None, screen=None):
+        self.path = path
+        self.levels = levels
+        self.sound_manager = sound_manager or SoundManager(muted=True)
+        self.screen = screen
+        self.clock = VirtualClock()
+        self.keyboard = VirtualKeyboard()
+        self.game_state = None
+        self.level = None
+        self.expected = None
+        self.steps = 0
+
+    def run(self, speed=0.0):
+        # speed is a multiple of real time, 0 replays as fast as possible without rendering
+        step_ms = 1000 / SIMULATION_HZ
+        started = time.perf_counter()
+        for record in read_log(self.path):
+            kind = record[0]
+            if kind == 'level':
+                _, index, difficulty, seed, sim_time = record
+                if index == 0:
+                    self.game_state = GameState(self.clock, self.keyboard)
+                    self.game_state.difficulty = difficulty
+                    self.game_state.time_remaining = DIFFICULTY_LEVELS[difficulty]['timer']
+                else:
+                    self.game_state.next_level()
+                self.clock.now = sim_time
+                random.seed(seed)
+                level_class = self.levels[index]
+                spec = level_class.generate_spec(difficulty, seed)
+                self.level = level_class(self.game_state, self.sound_manager, spec=spec)
+            elif kind == 'end':
+                self.expected = record[1:]
+            else:
+                if kind == 'step':
+                    _, mask, events = record
+                    self.keyboard.held = {key for bit, key in enumerate(RECORDED_KEYS) if mask & (1 << bit)}
+                    count = 1
+                else:
+                    events, count = [], record[1]
+                for _ in range(count):
+                    self.clock.advance(step_ms)
+                    self.level.update(events)
+                    events = []
+                    self.steps += 1
+                    if speed > 0:
+                        self._present(started + self.steps * step_ms / 1000 / speed)
+        return self.game_state
+
+    def _present(self, deadline):
+        if self.screen is not None:
+            self.level.draw(self.screen)
+            self.level.get_dirty_rects()
+            pygame.display.flip()
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def verify(self, speed=0.0):
+        state = self.run(speed)
+        if self.expected is None:
+            raise AssertionError("Replay log has no end record, the session did not exit cleanly")
+        actual = (state.score, state.lives)
+        if actual != self.expected:
+            raise AssertionError(f"Replay diverged: score/lives {actual}, recorded {self.expected}")
+        return state
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session and check its final score and lives")
+    parser.add_argument('log')
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="multiple of real time, 0 (default) runs as fast as possible without rendering")
+    args = parser.parse_args()
+
+    if args.speed <= 0:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.init()
+    # Levels convert surfaces at construction, so a display mode is needed even without rendering
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    from main import LEVELS
+    replayer = Replayer(args.log, LEVELS, screen=screen if args.speed > 0 else None)
+    start = time.perf_counter()
+    state = replayer.verify(args.speed)
+    print(f"Replayed {replayer.steps} steps in {time.perf_counter() - start:.2f}s: "
+          f"score {state.score}, lives {state.lives} match the recording")
+
+if __name__ == "__main__":
+    main()
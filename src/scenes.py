@@ -0,0 +1,238 @@
+import pygame
+from config import *
+from font_manager import font_manager
+from game_state import GameState
+from profiler import profiler
+from telemetry import telemetry, GAME_START
+
+LEVEL_NAMES = ["Firewall Breach", "Encrypted Room", "AI Showdown"]
+DIFFICULTIES = ['Easy', 'Medium', 'Hard']
+
+class Scene:
+    level = None  # Level the renderer takes dirty rects from, None redraws the whole screen
+
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self):
+        pass
+
+    def update(self, events, frame_ms):
+        pass
+
+    def draw(self, screen):
+        pass
+
+class MenuScene(Scene):
+    can_continue = False
+
+    def enter(self):
+        # A recording has to start from a fresh level, so it can't pick up an autosave
+        self.can_continue = not self.game.recorder and self.game.autosave.exists()
+
+    def update(self, events, frame_ms):
+        game_state = self.game.game_state
+        selected = DIFFICULTIES.index(game_state.difficulty.title())
+        for event in events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_SPACE:
+                telemetry.emit(GAME_START, game_state, selected, 0)
+                self.game.switch(TransitionScene(self.game, game_state.current_level))
+                return
+            if event.key == pygame.K_c and self.can_continue:
+                restored = self.game.restore()
+                if restored:
+                    index, loading = restored
+                    game_state = self.game.game_state
+                    telemetry.emit(GAME_START, game_state, DIFFICULTIES.index(game_state.difficulty.title()), 1)
+                    self.game.switch(TransitionScene(self.game, index, loading))
+                    return
+                self.can_continue = False
+            if event.key in (pygame.K_UP, pygame.K_DOWN):
+                selected = (selected + (1 if event.key == pygame.K_DOWN else -1)) % len(DIFFICULTIES)
+                game_state.difficulty = DIFFICULTIES[selected].lower()
+                game_state.time_remaining = DIFFICULTY_LEVELS[game_state.difficulty]['timer']
+                self.game.generator.prefetch(game_state.difficulty)
+
+    def draw(self, screen):
+        screen.fill(BLACK)
+        title = font_manager.render("Code Breaker: Cyber Heist", 74, CYAN)
+        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 4))
+        pulse_factor = (pygame.time.get_ticks() % PULSE_SPEED) / PULSE_SPEED
+        title_rect.y += int(10 * pulse_factor)
+        screen.blit(title, title_rect)
+
+        button_height = 50
+        spacing = 20
+        selected = DIFFICULTIES.index(self.game.game_state.difficulty.title())
+        for i, diff in enumerate(DIFFICULTIES):
+            button_rect = pygame.Rect(
+                WINDOW_WIDTH // 4,
+                WINDOW_HEIGHT // 2 + i * (button_height + spacing),
+                WINDOW_WIDTH // 2,
+                button_height
+            )
+            color = GREEN if i == selected else WHITE
+            pygame.draw.rect(screen, color, button_rect, 2)
+            text = font_manager.render(diff, 36, color)
+            screen.blit(text, text.get_rect(center=button_rect.center))
+
+        start_text = font_manager.render("Press SPACE to Start", 36, WHITE)
+        screen.blit(start_text, start_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT * 3 // 4)))
+        if self.can_continue:
+            continue_text = font_manager.render("Press C to Continue", 36, GREEN)
+            screen.blit(continue_text, continue_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT * 3 // 4 + 40)))
+
+class TransitionScene(Scene):
+    # Title card for the next level, the level itself is built on the loader thread meanwhile.
+    # loading is given for a level already on its way, such as one restored from the autosave
+    def __init__(self, game, index, loading=None):
+        super().__init__(game)
+        self.index = index
+        self.elapsed = 0
+        self.loading = loading
+        self.restoring = loading is not None
+
+    def enter(self):
+        if self.loading is None:
+            self.loading = self.game.preload_level(self.index)
+        self.game.sound_manager.play('hack')
+
+    def update(self, events, frame_ms):
+        self.elapsed += frame_ms
+        if self.elapsed >= TRANSITION_MS and self.loading.done():
+            try:
+                level = self.loading.result()
+            except ValueError as e:
+                if not self.restoring:
+                    raise
+                # The save's level section didn't fit the level rebuilt from it, start over from the menu
+                self.game.discard_autosave(e)
+                self.game.game_state = GameState(self.game.sim_clock)
+                self.game.reset(MenuScene(self.game))
+                return
+            self.game.switch(LevelScene(self.game, level))
+
+    def draw(self, screen):
+        screen.fill(BLACK)
+        progress = min(1.0, self.elapsed / TRANSITION_MS)
+        # Scanlines sweep down while the title types itself out
+        sweep = int(WINDOW_HEIGHT * progress)
+        for y in range(0, sweep, 6):
+            pygame.draw.line(screen, (0, 40 + y * 60 // WINDOW_HEIGHT, 0), (0, y), (WINDOW_WIDTH, y))
+
+        title = f"Level {self.index + 1}: {LEVEL_NAMES[self.index]}"
+        shown = title[:round(len(title) * min(1.0, progress * 1.5))]
+        if shown:
+            text = font_manager.render(shown, 48, GREEN)
+            screen.blit(text, text.get_rect(midleft=(WINDOW_WIDTH // 2 - font_manager.get_font(48).size(title)[0] // 2,
+                                                     WINDOW_HEIGHT // 2)))
+
+        bar = pygame.Rect(WINDOW_WIDTH // 4, WINDOW_HEIGHT * 2 // 3, WINDOW_WIDTH // 2, 12)
+        pygame.draw.rect(screen, GREEN, bar, 1)
+        pygame.draw.rect(screen, GREEN, (bar.x + 2, bar.y + 2, round((bar.width - 4) * progress), bar.height - 4))
+        if progress >= 1.0 and not self.loading.done():
+            status = font_manager.render("Decrypting...", 28, WHITE)
+            screen.blit(status, status.get_rect(midtop=(WINDOW_WIDTH // 2, bar.bottom + 10)))
+
+class LevelScene(Scene):
+    def __init__(self, game, level):
+        super().__init__(game)
+        self.level = level
+        self.accumulator = 0.0
+        self.pending_events = []
+        self.saved_at = 0
+
+    def enter(self):
+        self.game.sound_manager.play('portal')
+        self.autosave()
+
+    def autosave(self):
+        self.saved_at = self.game.sim_clock.now
+        self.game.save(self.level)
+        telemetry.flush()  # Same cadence for handing logged events to the writer
+
+    def update(self, events, frame_ms):
+        # Fixed-step updates for the real time that passed, events go to the first step
+        game = self.game
+        game_state = game.game_state
+        self.accumulator += frame_ms
+        self.pending_events.extend(events)
+        steps = 0
+        while self.accumulator >= game.step_ms and steps < MAX_FRAME_SKIP:
+            self.accumulator -= game.step_ms
+            game.sim_clock.advance(game.step_ms)
+            if game.recorder:
+                game.recorder.step(self.pending_events, game_state.keyboard.get_pressed())
+            with profiler.span('update'):
+                self.level.update(self.pending_events)
+            self.pending_events = []
+            steps += 1
+            if game_state.level_complete or game_state.game_over:
+                break
+        if steps == MAX_FRAME_SKIP:
+            # Too far behind, drop the backlog and let the game slow down instead
+            self.accumulator = min(self.accumulator, game.step_ms)
+        self.level.interpolation = min(1.0, self.accumulator / game.step_ms)
+
+        if game_state.game_over:
+            game.push(GameOverScene(game, complete=False))
+        elif game_state.level_complete:
+            if game_state.current_level < len(game.levels) - 1:
+                game_state.next_level()
+                game.switch(TransitionScene(game, game_state.current_level))
+            else:
+                game.push(GameOverScene(game, complete=True))
+        elif game.sim_clock.now - self.saved_at >= AUTOSAVE_INTERVAL_MS:
+            self.autosave()
+
+    def draw(self, screen):
+        self.level.draw(screen)
+
+class GameOverScene(Scene):
+    # Pushed over the finished level, which stays frozen underneath
+    def __init__(self, game, complete):
+        super().__init__(game)
+        self.complete = complete
+        self.elapsed = 0
+        self.below = game.scenes[-1] if game.scenes else None
+        self.shade = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    def enter(self):
+        self.game.autosave.delete()  # The run is over, there is nothing left to continue
+        telemetry.flush()
+        self.game.sound_manager.stop('ambient')
+        self.game.sound_manager.play('success' if self.complete else 'alert')
+
+    def update(self, events, frame_ms):
+        self.elapsed += frame_ms
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                self.game.game_state = GameState(self.game.sim_clock)
+                self.game.sound_manager.play_loop('ambient', volume=0.2)
+                self.game.reset(MenuScene(self.game))
+                return
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_q:
+                self.game.quit()
+
+    def draw(self, screen):
+        if self.below and self.below.level:
+            self.below.draw(screen)
+            self.below.level.get_dirty_rects()  # Presented as a full frame, not by dirty rects
+        else:
+            screen.fill(BLACK)
+        self.shade.set_alpha(min(220, int(self.elapsed * 220 / 500)))  # Fades in over half a second
+        screen.blit(self.shade, (0, 0))
+
+        if self.complete:
+            text = font_manager.render("Mission Complete!", 64, GREEN)
+        else:
+            text = font_manager.render("Mission Failed", 64, RED)
+        screen.blit(text, text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3)))
+
+        score_text = font_manager.render(f"Score: {self.game.game_state.score}", 48, WHITE)
+        screen.blit(score_text, score_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
+
+        inst_text = font_manager.render("Press R to Restart or Q to Quit", 36, WHITE)
+        screen.blit(inst_text, inst_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT * 2 // 3)))
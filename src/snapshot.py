@@ -0,0 +1,143 @@
+import os
+import struct
+import threading
+import zlib
+from config import *
+from game_state import GameState
+
+# Save layout: header, game state, then the level's own section written by its snapshot().
+# Levels are rebuilt from their spec seed and layout, the section only holds what play has changed
+MAGIC = b'CBSV'
+VERSION = 3  # 2: firewall patterns are windows on a PatternStream, 3: swarm return paths
+HEADER = struct.Struct('<4sBI')  # magic, version, crc32 of everything after the header
+GAME = struct.Struct('<BBIiiiBBd')  # level index, difficulty index, spec seed, score, lives, time remaining,
+                                    # game over, level complete, simulation clock
+AUTOSAVE_PATH = os.path.join(CACHE_DIR, 'saves', 'autosave.cbs')
+
+DIFFICULTIES = list(DIFFICULTY_LEVELS)
+
+def dump(game_state, clock, level):
+    body = GAME.pack(game_state.current_level, DIFFICULTIES.index(game_state.difficulty), level.seed,
+                     game_state.score, game_state.lives, game_state.time_remaining,
+                     game_state.game_over, game_state.level_complete, clock.now) + level.snapshot()
+    return HEADER.pack(MAGIC, VERSION, zlib.crc32(body)) + body
+
+def read(data, clock=None, keyboard=None):
+    # Returns (game state, level index, spec seed, simulation clock, level section)
+    if len(data) < HEADER.size + GAME.size:
+        raise ValueError("Truncated save")
+    magic, version, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} save")
+    body = data[HEADER.size:]
+    if zlib.crc32(body) != checksum:
+        raise ValueError("Corrupt save, checksum mismatch")
+    index, difficulty, seed, score, lives, time_remaining, game_over, level_complete, now = GAME.unpack_from(body)
+    game_state = GameState(clock, keyboard)
+    game_state.current_level = index
+    game_state.difficulty = DIFFICULTIES[difficulty]
+    game_state.score = score
+    game_state.lives = lives
+    game_state.time_remaining = time_remaining
+    game_state.game_over = bool(game_over)
+    game_state.level_complete = bool(level_complete)
+    return game_state, index, seed, now, body[GAME.size:]
+
+class SnapshotReader:
+    # Cursor over a level section, anything short or malformed is a ValueError
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, layout):
+        try:
+            values = layout.unpack_from(self.data, self.offset)
+        except struct.error as e:
+            raise ValueError(f"Truncated save: {e}") from None
+        self.offset += layout.size
+        return values
+
+    def take(self, count):
+        chunk = self.data[self.offset:self.offset + count]
+        if len(chunk) != count:
+            raise ValueError("Truncated save")
+        self.offset += count
+        return chunk
+
+class AutosaveWriter:
+    # Saves are written on a background thread, a newer save replaces one still waiting to be written
+    def __init__(self, path=AUTOSAVE_PATH):
+        self.path = path
+        self.condition = threading.Condition()
+        self.pending = None
+        self.has_pending = False
+        self.closed = False
+        self.written = 0
+        self.thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self.thread.start()
+
+    def save(self, data):
+        self._queue(data)
+
+    def delete(self):
+        self._queue(None)
+
+    def _queue(self, data):
+        with self.condition:
+            self.pending = data
+            self.has_pending = True
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.has_pending and not self.closed:
+                    self.condition.wait()
+                if not self.has_pending:
+                    return
+                data = self.pending
+                self.pending = None
+                self.has_pending = False
+            try:
+                if data is None:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                else:
+                    self._write(data)
+            except OSError as e:
+                print(f"Warning: Could not update autosave {self.path}: {e}")
+
+    def _write(self, data):
+        # Written beside the save and renamed over it, a crash mid-write leaves the previous save intact
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.written += 1
+
+    def load(self):
+        # Latest save, including one not yet on disk, None if there is none
+        with self.condition:
+            if self.has_pending:
+                return self.pending
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def exists(self):
+        with self.condition:
+            if self.has_pending:
+                return self.pending is not None
+        return os.path.exists(self.path)
+
+    def close(self):
+        # Finishes any waiting write
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
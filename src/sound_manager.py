@@ -1,36 +1,195 @@
 import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pygame
+from config import CACHE_DIR
+from game_io import RealClock
+
+SOUND_FILES = {
+    'alert': 'alert.ogg',
+    'success': 'success.ogg',
+    'scan': 'scan.ogg',
+    'hack': 'hack.ogg',
+    'error': 'error.ogg',
+    'portal': 'portal.ogg',
+    'terminal': 'terminal.ogg',
+    'ambient': 'ambient.ogg',
+    'power_up': 'power_up.ogg'
+}
+# Decode order: the start screen and level 1 first, sounds only level 3 uses last
+LOAD_ORDER = ['ambient', 'portal', 'scan', 'terminal', 'success', 'error', 'hack', 'power_up', 'alert']
+# Cues that play another cue's sound under their own voice rule
+SOUND_CUES = {'detected': 'alert'}
+# Reserved mixer channels per group, a sound only ever plays on its own group's channels
+SOUND_GROUPS = {'music': 1, 'alerts': 2, 'ui': 3, 'effects': 4}
+# Voice rules: higher priority steals a channel from lower, cooldown in ms between starts
+SOUND_RULES = {
+    'ambient': {'group': 'music', 'priority': 3, 'cooldown': 0, 'max_instances': 1},
+    'alert': {'group': 'alerts', 'priority': 3, 'cooldown': 0, 'max_instances': 2},  # One-shots: caught, time's up, game over
+    'detected': {'group': 'alerts', 'priority': 2, 'cooldown': 1000, 'max_instances': 1},  # Repeats while an AI is alerted
+    'error': {'group': 'alerts', 'priority': 2, 'cooldown': 100, 'max_instances': 2},
+    'terminal': {'group': 'ui', 'priority': 1, 'cooldown': 40, 'max_instances': 3},
+    'scan': {'group': 'ui', 'priority': 1, 'cooldown': 100, 'max_instances': 1},
+    'success': {'group': 'effects', 'priority': 2, 'cooldown': 100, 'max_instances': 2},
+    'hack': {'group': 'effects', 'priority': 2, 'cooldown': 100, 'max_instances': 1},
+    'portal': {'group': 'effects', 'priority': 2, 'cooldown': 200, 'max_instances': 1},
+    'power_up': {'group': 'effects', 'priority': 1, 'cooldown': 100, 'max_instances': 2}
+}
+DEFAULT_RULE = {'group': 'effects', 'priority': 1, 'cooldown': 0, 'max_instances': 4}
+# assets/sounds, one level up from src
+SOUND_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets', 'sounds'))
+
+class SilentSound:
+    # Stands in for a sound until its decode finishes
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+SILENT = SilentSound()
 
 class SoundManager:
-    def __init__(self):
+    def __init__(self, muted=False, cache_dir=CACHE_DIR, workers=2, clock=None):
         self.sounds = {}
-        self._load_sounds()
-        
-    def _load_sounds(self):
-        sound_files = {
-            'alert': 'alert.ogg',
-            'success': 'success.ogg',
-            'scan': 'scan.ogg',
-            'hack': 'hack.ogg',
-            'error': 'error.ogg',
-            'portal': 'portal.ogg',
-            'terminal': 'terminal.ogg',
-            'ambient': 'success.ogg',
-            'power_up': 'power_up.ogg'
-        }
-        
-        # Get the absolute directory of the current script (sound_manager.py)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Construct path to assets/sounds, one level up from src
-        for sound_name, file_name in sound_files.items():
-            try:
-                sound_path = os.path.join(current_dir, '..', 'assets', 'sounds', file_name)
-                sound_path = os.path.normpath(sound_path)  # Normalize to resolve '..' correctly
-                self.sounds[sound_name] = pygame.mixer.Sound(sound_path)
-            except (pygame.error, FileNotFoundError) as e:
-                print(f"Warning: Could not load sound {file_name}: {e}")
-    
+        self.loops = {}  # Looping sounds requested so far, restarted once their real sound arrives
+        self.lock = threading.Lock()
+        self.futures = []
+        self.cache_dir = os.path.join(cache_dir, 'sounds') if cache_dir else None
+        self.clock = clock or RealClock()
+        self.groups = {}
+        self.voices = {}  # channel -> (sound name, priority, start time) of the last sound it was given
+        self.last_start = {}
+        self.played = 0
+        self.stolen = 0
+        self.dropped = {'cooldown': 0, 'instances': 0, 'priority': 0}
+        if not muted:  # Headless runs skip the mixer entirely, play() then does nothing
+            self._reserve_channels()
+            self._load_sounds(workers)
+
+    def _reserve_channels(self):
+        total = sum(SOUND_GROUPS.values())
+        pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)  # Sound.play() elsewhere can't take our channels
+        first = 0
+        for group, count in SOUND_GROUPS.items():
+            self.groups[group] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            first += count
+
+    def _load_sounds(self, workers):
+        # Decoding happens on a thread pool so the first frame doesn't wait for it
+        for sound_name in SOUND_FILES:
+            self.sounds[sound_name] = SILENT
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sound-loader')
+        for sound_name in LOAD_ORDER:
+            self.futures.append(executor.submit(self._load, sound_name))
+        executor.shutdown(wait=False)
+
+    def _load(self, sound_name):
+        file_name = SOUND_FILES[sound_name]
+        try:
+            sound = self._decode(os.path.join(SOUND_DIR, file_name))
+        except (pygame.error, OSError) as e:
+            print(f"Warning: Could not load sound {file_name}: {e}")
+            return
+        with self.lock:
+            self.sounds[sound_name] = sound
+            if sound_name in self.loops:
+                self._start(sound_name, self.loops[sound_name], -1)
+
+    def _decode(self, path):
+        # Decoded PCM is cached by file hash and mixer format, warm starts skip OGG decoding
+        with open(path, 'rb') as f:
+            data = f.read()
+        mixer = pygame.mixer.get_init()
+        if not self.cache_dir or not mixer:
+            return pygame.mixer.Sound(path)
+        digest = hashlib.sha1(data).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"{digest}_{mixer[0]}_{mixer[1]}_{mixer[2]}.pcm")
+        try:
+            with open(cache_path, 'rb') as f:
+                return pygame.mixer.Sound(buffer=f.read())
+        except OSError:
+            pass
+        sound = pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(sound.get_raw())
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Warning: Could not cache decoded sound {os.path.basename(path)}: {e}")
+        return sound
+
+    def wait(self):
+        # Block until every sound has finished loading
+        for future in self.futures:
+            future.result()
+
+    def _live(self, channel):
+        # The voice a channel is still playing, None once it has finished
+        voice = self.voices.get(channel)
+        if voice and channel.get_busy() and channel.get_sound() is self.sounds.get(SOUND_CUES.get(voice[0], voice[0])):
+            return voice
+        return None
+
+    def _start(self, sound_name, volume, loops):
+        sound = self.sounds.get(SOUND_CUES.get(sound_name, sound_name))
+        if sound is None or sound is SILENT:
+            return None
+        rule = SOUND_RULES.get(sound_name, DEFAULT_RULE)
+        now = self.clock.ticks()
+        last = self.last_start.get(sound_name)
+        if last is not None and now - last < rule['cooldown']:
+            self.dropped['cooldown'] += 1
+            return None
+
+        live = [(channel, self._live(channel)) for channel in self.groups[rule['group']]]
+        if sum(1 for _, voice in live if voice and voice[0] == sound_name) >= rule['max_instances']:
+            self.dropped['instances'] += 1
+            return None
+        free = [channel for channel, voice in live if voice is None]
+        if free:
+            channel = free[0]
+        else:
+            # Group is full, steal the lowest priority voice, the oldest among equals
+            channel, voice = min(live, key=lambda item: (item[1][1], item[1][2]))
+            if voice[1] > rule['priority']:
+                self.dropped['priority'] += 1
+                return None
+            self.stolen += 1
+            channel.stop()
+
+        # Volume is set on the channel, the shared Sound stays at full volume for its other voices
+        channel.set_volume(volume)
+        channel.play(sound, loops=loops)
+        self.voices[channel] = (sound_name, rule['priority'], now)
+        self.last_start[sound_name] = now
+        self.played += 1
+        return channel
+
     def play(self, sound_name, volume=1.0):
-        if sound_name in self.sounds:
-            self.sounds[sound_name].set_volume(volume)
-            self.sounds[sound_name].play()
\ No newline at end of file
+        with self.lock:
+            return self._start(sound_name, volume, 0)
+
+    def play_loop(self, sound_name, volume=1.0):
+        with self.lock:
+            self.loops[sound_name] = volume
+            if not any(voice and voice[0] == sound_name for voice in map(self._live, list(self.voices))):
+                self._start(sound_name, volume, -1)
+
+    def stop(self, sound_name):
+        with self.lock:
+            self.loops.pop(sound_name, None)
+            for channel in list(self.voices):
+                if self._live(channel) and self.voices[channel][0] == sound_name:
+                    channel.stop()
+                    del self.voices[channel]
+
+    def stats(self):
+        return {'played': self.played, 'stolen': self.stolen, 'dropped': dict(self.dropped)}
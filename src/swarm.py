@@ -0,0 +1,222 @@
+import math
+import pygame
+from config import AI_VIEW_DISTANCE, AI_VIEW_ANGLE
+
+try:
+    import numpy as np
+except ImportError:  # The swarm engine is optional, AIShowdown falls back to per-object AIs
+    np = None
+
+class AISwarm:
+    available = np is not None
+
+    def __init__(self, ais, nav, walls, visibility=None, speed=300, size=20):
+        count = len(ais)
+        self.nav = nav
+        self.visibility = visibility
+        self.speed = speed
+        self.size = size
+        self.pos = np.array([ai.rect.topleft for ai in ais], dtype=np.float64)
+        self.previous = self.pos.copy()
+        self.alert = np.zeros(count, dtype=bool)
+        self.alert_time = np.zeros(count, dtype=np.int64)
+        self.patrol_index = np.zeros(count, dtype=np.int64)
+        self.facing = np.array([ai.facing for ai in ais], dtype=np.float64)
+
+        # Patrol routes padded to one (count, longest, 2) array, empty routes hold position
+        longest = max([len(ai.patrol_points) for ai in ais] + [1])
+        self.patrol = np.empty((count, longest, 2), dtype=np.float64)
+        self.patrol_length = np.ones(count, dtype=np.int64)
+        for i, ai in enumerate(ais):
+            points = ai.patrol_points or [ai.rect.topleft]
+            self.patrol[i, :len(points)] = points
+            self.patrol[i, len(points):] = points[-1]
+            self.patrol_length[i] = len(points)
+        self.rows_index = np.arange(count)
+
+        # Patrol legs are straight corridors, but a chase leaves bots off their route. Until they reach
+        # their patrol point again they follow a NavGrid path to it, the way AI._next_path_waypoint does
+        self.returning = np.zeros(count, dtype=bool)
+        self.paths = [()] * count
+        self.path_length = np.full(count, -1, dtype=np.int64)  # -1 while a bot has no path
+        self.path_step = np.zeros(count, dtype=np.int64)
+        self.waypoint = np.zeros((count, 2), dtype=np.float64)
+
+        # View over the NavGrid flow field, it updates in place
+        self.flow = np.frombuffer(nav.flow, dtype=np.intc)
+        self._build_occupancy(walls, nav.cols * nav.cell_size, nav.rows * nav.cell_size)
+
+    def __len__(self):
+        return len(self.pos)
+
+    def _state(self):
+        # Arrays that change during play, in save order
+        return (self.pos, self.previous, self.facing, self.alert, self.alert_time, self.patrol_index,
+                self.returning, self.path_length, self.path_step, self.waypoint)
+
+    def snapshot(self):
+        # The arrays, then the waypoints of every bot that has a path, in bot order
+        points = [point for i in np.nonzero(self.path_length >= 0)[0] for point in self.paths[i]]
+        return (b''.join(array.tobytes() for array in self._state()) +
+                np.array(points, dtype=np.int32).reshape(-1, 2).tobytes())
+
+    def restore(self, reader):
+        for array in self._state():
+            array.reshape(-1)[:] = np.frombuffer(reader.take(array.nbytes), dtype=array.dtype)
+        self.paths = [()] * len(self.pos)
+        for i in np.nonzero(self.path_length >= 0)[0]:
+            length = int(self.path_length[i])
+            points = np.frombuffer(reader.take(length * 8), dtype=np.int32).reshape(-1, 2)
+            self.paths[i] = tuple((int(x), int(y)) for x, y in points)
+
+    def update(self, player, current_time, dt):
+        # speed is in pixels per second, dt the length of this simulation step
+        nav = self.nav
+        cell = nav.cell_size
+        step_length = self.speed * dt
+        self.previous[:] = self.pos
+        self.alert &= (current_time - self.alert_time) <= 3000
+        chasing = self.alert & player.visible
+        step = np.zeros_like(self.pos)
+
+        if chasing.any():
+            centers = self.pos + self.size / 2
+            cols = np.clip(centers[:, 0] // cell, 0, nav.cols - 1).astype(np.int64)
+            rows = np.clip(centers[:, 1] // cell, 0, nav.rows - 1).astype(np.int64)
+            current = rows * nav.cols + cols
+            following = self.flow[current]
+            waypoint = chasing & (following != -1) & (following != current)
+            targets = np.stack(((following % nav.cols) * cell + cell // 2,
+                                (following // nav.cols) * cell + cell // 2), axis=1)
+            step[waypoint] = np.clip(targets - centers, -step_length, step_length)[waypoint]
+
+            direct = chasing & ~waypoint
+            delta = np.array(player.rect.topleft, dtype=np.float64) - self.pos
+            dist = np.hypot(delta[:, 0], delta[:, 1])
+            direct &= dist > 0
+            step[direct] = delta[direct] / dist[direct, None] * step_length
+
+        self.returning |= chasing
+        self.path_length[chasing] = -1
+        patrolling = ~chasing
+        targets = self.patrol[self.rows_index, self.patrol_index]
+        delta = targets - self.pos
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        arrived = patrolling & (dist < 10)
+        self.patrol_index[arrived] = (self.patrol_index[arrived] + 1) % self.patrol_length[arrived]
+        self.returning &= ~arrived  # Back on the route, the next leg is a straight corridor again
+        self.path_length[arrived] = -1
+        moving = patrolling & ~arrived
+        guided = self._follow_paths(moving & self.returning, targets)
+        if guided.any():
+            # Each axis closes at most one step, like AI.step_towards, which keeps bots centred in corridors
+            centers = self.pos + self.size / 2
+            step[guided] = np.clip(self.waypoint - centers, -step_length, step_length)[guided]
+        straight = moving & ~guided
+        step[straight] = delta[straight] / dist[straight, None] * step_length
+
+        self._move(step)
+        length = np.hypot(step[:, 0], step[:, 1])
+        turning = length > 0
+        self.facing[turning] = step[turning] / length[turning, None]
+
+        if player.visible:
+            seen = self._sees(player)
+            self.alert |= seen
+            self.alert_time[seen] = current_time
+
+    def _follow_paths(self, returning, targets):
+        # Bots in returning that still have a waypoint ahead, self.waypoint holds it
+        centers = self.pos + self.size / 2
+        new = returning & (self.path_length < 0)
+        for i in np.nonzero(new)[0]:
+            self.paths[i] = self.nav.find_path(centers[i], targets[i] + self.size / 2) or ()
+            self.path_length[i] = len(self.paths[i])
+            self.path_step[i] = 0
+        ahead = returning & (self.path_step < self.path_length)
+        reached = ahead & (np.abs(self.waypoint - centers).sum(axis=1) <= 1)
+        # Only bots given a path or at a waypoint this step look up their next one
+        for i in np.nonzero(new | reached)[0]:
+            path = self.paths[i]
+            k = int(self.path_step[i])
+            while k < len(path) and abs(path[k][0] - centers[i, 0]) + abs(path[k][1] - centers[i, 1]) <= 1:
+                k += 1
+            self.path_step[i] = k
+            if k < len(path):
+                self.waypoint[i] = path[k]
+        return returning & (self.path_step < self.path_length)
+
+    def _sees(self, player):
+        if self.visibility is None:
+            zone = player.rect.inflate(150, 150)
+            return ((self.pos[:, 0] < zone.right) & (self.pos[:, 0] + self.size > zone.left) &
+                    (self.pos[:, 1] < zone.bottom) & (self.pos[:, 1] + self.size > zone.top))
+        centers = self.pos + self.size / 2
+        delta = np.array(player.rect.center, dtype=np.float64) - centers
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        cone = (delta * self.facing).sum(axis=1) >= math.cos(math.radians(AI_VIEW_ANGLE / 2)) * dist
+        candidates = (dist <= AI_VIEW_DISTANCE) & (cone | self.alert)
+        seen = np.zeros(len(self.pos), dtype=bool)
+        if candidates.any():
+            seen[candidates] = self.visibility.line_of_sight_batch(centers[candidates], player.rect.center)
+        return seen
+
+    def _build_occupancy(self, walls, width, height):
+        # Wall cover on a grid fine enough that every wall edge falls on a cell edge, so testing a rect
+        # against it gives the same answer as the SpatialHash per-object AIs collide with
+        grain = math.gcd(self.nav.cell_size, *(value for wall in walls for value in (wall.x, wall.y, wall.w, wall.h)))
+        self.grain = max(grain, 1)
+        solid = np.zeros((-(-height // self.grain), -(-width // self.grain)), dtype=np.int32)
+        for wall in walls:
+            solid[max(wall.top, 0) // self.grain:max(wall.bottom, 0) // self.grain,
+                  max(wall.left, 0) // self.grain:max(wall.right, 0) // self.grain] = 1
+        # Summed-area table, the wall cells under any rect are four lookups
+        self.cover = np.zeros((solid.shape[0] + 1, solid.shape[1] + 1), dtype=np.int32)
+        self.cover[1:, 1:] = solid.cumsum(axis=0).cumsum(axis=1)
+
+    def _blocked(self, pos):
+        grain = self.grain
+        rows, cols = self.cover.shape[0] - 1, self.cover.shape[1] - 1
+        left = pos[:, 0] // grain
+        right = np.ceil((pos[:, 0] + self.size) / grain) - 1
+        top = pos[:, 1] // grain
+        bottom = np.ceil((pos[:, 1] + self.size) / grain) - 1
+        outside = (left < 0) | (top < 0) | (right >= cols) | (bottom >= rows)
+        left = np.clip(left, 0, cols - 1).astype(np.int64)
+        right = np.clip(right, 0, cols - 1).astype(np.int64) + 1
+        top = np.clip(top, 0, rows - 1).astype(np.int64)
+        bottom = np.clip(bottom, 0, rows - 1).astype(np.int64) + 1
+        cover = self.cover
+        return outside | (cover[bottom, right] - cover[top, right] - cover[bottom, left] + cover[top, left] > 0)
+
+    def _move(self, step):
+        # Per-axis resolution against the wall cover, bots already inside a wall may move out.
+        # A blocked step is dropped rather than cut short at the wall, corridor steering re-centres bots anyway
+        for axis in (0, 1):
+            stuck = self._blocked(self.pos)
+            candidate = self.pos.copy()
+            candidate[:, axis] += step[:, axis]
+            free = ~self._blocked(candidate) | stuck
+            self.pos[free, axis] = candidate[free, axis]
+
+    def any_alert(self):
+        return bool(self.alert.any())
+
+    def alert_count(self):
+        return int(self.alert.sum())
+
+    def recently_alerted(self, current_time):
+        return bool((self.alert & ((current_time - self.alert_time) < 1000)).any())
+
+    def touches(self, rect):
+        return bool(((self.pos[:, 0] < rect.right) & (self.pos[:, 0] + self.size > rect.left) &
+                     (self.pos[:, 1] < rect.bottom) & (self.pos[:, 1] + self.size > rect.top)).any())
+
+    def visible(self, view, alpha=1.0):
+        # Interpolated rects and alert flags of bots inside the camera view, for drawing
+        margin = 10
+        drawn = self.previous + (self.pos - self.previous) * alpha
+        inside = np.nonzero((self.pos[:, 0] < view.right + margin) & (self.pos[:, 0] + self.size > view.left - margin) &
+                            (self.pos[:, 1] < view.bottom + margin) & (self.pos[:, 1] + self.size > view.top - margin))[0]
+        for i in inside:
+            yield pygame.Rect(round(drawn[i, 0]), round(drawn[i, 1]), self.size, self.size), bool(self.alert[i])
@@ -0,0 +1,203 @@
+import os
+import sys
+import time
+import random
+import struct
+import argparse
+import threading
+from array import array
+from collections import Counter, deque
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
+
+from config import *
+
+# Gameplay events, the index is the stored kind code. a and b depend on the kind:
+#   game_start: difficulty index, 1 when continued from the autosave
+#   score: points, new score            life_lost: lives left
+#   next_level: new level index         pattern: 1 if matched, pattern length
+#   rotate: piece index, connected count    lock: piece index
+#   alert: bots alerted                 caught: player x, y
+#   cloak: 1 if any bot was alerted
+EVENT_KINDS = ('game_start', 'score', 'life_lost', 'next_level', 'pattern', 'rotate', 'lock', 'alert', 'caught', 'cloak')
+GAME_START, SCORE, LIFE_LOST, NEXT_LEVEL, PATTERN, ROTATE, LOCK, ALERT, CAUGHT, CLOAK = range(len(EVENT_KINDS))
+
+# Log layout: header, then blocks appended by any number of sessions, each written with a single
+# append so concurrent kiosk processes can share one file. A block is its session id and event count,
+# then each column in COLUMNS order as a packed array
+MAGIC = b'CBTL'
+VERSION = 1
+HEADER = struct.Struct('<4sB')
+BLOCK = struct.Struct('<QI')
+COLUMNS = (('time', 'I'), ('kind', 'B'), ('level', 'B'), ('a', 'i'), ('b', 'i'))  # time is simulated ms
+TELEMETRY_PATH = os.path.join(CACHE_DIR, 'telemetry', 'events.cbt')
+
+class EventBlock:
+    def __init__(self, capacity):
+        self.columns = [array(code, [0]) * capacity for _, code in COLUMNS]
+        self.count = 0
+
+class Telemetry:
+    def __init__(self, capacity=TELEMETRY_BLOCK_EVENTS, blocks=TELEMETRY_BLOCKS):
+        self.enabled = False
+        self.capacity = capacity
+        # Preallocated blocks: one filling, the rest free or waiting for the writer thread
+        self.free = deque(EventBlock(capacity) for _ in range(blocks))
+        self.block = self.free.popleft()
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.path = None
+        self.session = 0
+        self.dropped = 0
+        self.written = 0
+
+    def start(self, path=TELEMETRY_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'ab+') as f:
+            f.seek(0)
+            header = f.read(HEADER.size)
+            if not header:
+                f.write(HEADER.pack(MAGIC, VERSION))
+            elif header != HEADER.pack(MAGIC, VERSION):
+                raise ValueError(f"Not a version {VERSION} telemetry log: {path}")
+        self.path = path
+        self.session = random.SystemRandom().getrandbits(64)
+        self.enabled = True  # Before the thread starts, it returns as soon as it sees logging off and nothing queued
+        self.thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self.thread.start()
+
+    def emit(self, kind, game_state, a=0, b=0):
+        # Called from the game loop, writes into the current block and never waits on disk
+        if not self.enabled:
+            return
+        block = self.block
+        i = block.count
+        if i == self.capacity:
+            if not self._hand_off():
+                self.dropped += 1  # Writer is behind and every block is full
+                return
+            block = self.block
+            i = 0
+        time_column, kind_column, level_column, a_column, b_column = block.columns
+        time_column[i] = game_state.clock.ticks()
+        kind_column[i] = kind
+        level_column[i] = game_state.current_level
+        a_column[i] = a
+        b_column[i] = b
+        block.count = i + 1
+
+    def flush(self):
+        # Queue what has been logged so far, for moments a session may end (game over, quit)
+        if self.enabled and self.block.count:
+            self._hand_off()
+
+    def _hand_off(self):
+        with self.condition:
+            if not self.free:
+                return False
+            self.queue.append(self.block)
+            self.block = self.free.popleft()
+            self.condition.notify()
+        return True
+
+    def _run(self):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            while True:
+                with self.condition:
+                    while not self.queue and self.enabled:
+                        self.condition.wait()
+                    if not self.queue:
+                        return
+                    block = self.queue[0]
+                count = block.count
+                data = BLOCK.pack(self.session, count) + b''.join(column[:count].tobytes() for column in block.columns)
+                try:
+                    os.write(fd, data)
+                    self.written += count
+                except OSError as e:
+                    print(f"Warning: Could not write telemetry to {self.path}: {e}")
+                with self.condition:
+                    self.queue.popleft()
+                    block.count = 0
+                    self.free.append(block)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        # Writes out everything logged so far
+        if not self.enabled:
+            return
+        self.flush()
+        with self.condition:
+            self.enabled = False
+            self.condition.notify()
+        self.thread.join()
+
+telemetry = Telemetry()
+
+def read_blocks(path):
+    # Yields (session id, {column name: array}) for each block
+    sizes = [array(code).itemsize for _, code in COLUMNS]
+    with open(path, 'rb') as f:
+        if f.read(HEADER.size) != HEADER.pack(MAGIC, VERSION):
+            raise ValueError(f"Not a version {VERSION} telemetry log: {path}")
+        while True:
+            head = f.read(BLOCK.size)
+            if not head:
+                return
+            if len(head) != BLOCK.size:
+                raise ValueError("Truncated telemetry block")
+            session, count = BLOCK.unpack(head)
+            columns = {}
+            for (name, code), size in zip(COLUMNS, sizes):
+                column = array(code)
+                data = f.read(count * size)
+                if len(data) != count * size:
+                    raise ValueError("Truncated telemetry block")
+                column.frombytes(data)
+                columns[name] = column
+            yield session, columns
+
+def summarize(path):
+    sessions = set()
+    events = Counter()  # (kind, level) -> count
+    points = Counter()  # level -> points scored
+    patterns = Counter()  # matched -> attempts
+    total = 0
+    for session, columns in read_blocks(path):
+        sessions.add(session)
+        kinds, levels, a = columns['kind'], columns['level'], columns['a']
+        total += len(kinds)
+        events.update(zip(kinds, levels))
+        for kind, level, value in zip(kinds, levels, a):
+            if kind == SCORE:
+                points[level] += value
+            elif kind == PATTERN:
+                patterns[value] += 1
+    return {'events': total, 'sessions': len(sessions), 'by_kind': events, 'points': points, 'patterns': patterns}
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a gameplay telemetry log")
+    parser.add_argument('log', nargs='?', default=TELEMETRY_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = summarize(args.log)
+    print(f"{summary['events']} events from {summary['sessions']} sessions "
+          f"read in {time.perf_counter() - start:.2f}s")
+    levels = sorted({level for _, level in summary['by_kind']})
+    print(f"{'event':<12}" + "".join(f"{'level ' + str(level + 1):>12}" for level in levels))
+    for code, name in enumerate(EVENT_KINDS):
+        counts = [summary['by_kind'][code, level] for level in levels]
+        if any(counts):
+            print(f"{name:<12}" + "".join(f"{count:>12}" for count in counts))
+    print(f"{'points':<12}" + "".join(f"{summary['points'][level]:>12}" for level in levels))
+    attempts = summary['patterns'][0] + summary['patterns'][1]
+    if attempts:
+        print(f"Firewall patterns matched: {summary['patterns'][1]}/{attempts} ({summary['patterns'][1] / attempts:.0%})")
+
+if __name__ == "__main__":
+    main()
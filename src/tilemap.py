@@ -0,0 +1,82 @@
+import pygame
+from collections import OrderedDict
+from config import *
+
+class Camera:
+    def __init__(self, view_width, view_height, world_width, world_height):
+        self.rect = pygame.Rect(0, 0, view_width, view_height)
+        self.world_width = world_width
+        self.world_height = world_height
+
+    def follow(self, target):
+        # Returns True when the view moved so the caller can force a full redraw
+        x = max(0, min(target.centerx - self.rect.width // 2, self.world_width - self.rect.width))
+        y = max(0, min(target.centery - self.rect.height // 2, self.world_height - self.rect.height))
+        moved = (x, y) != self.rect.topleft
+        self.rect.topleft = (x, y)
+        return moved
+
+    def apply(self, rect):
+        return rect.move(-self.rect.x, -self.rect.y)
+
+    def is_visible(self, rect):
+        return self.rect.colliderect(rect)
+
+class TileMap:
+    def __init__(self, tiles, width, height, tile_size, chunk_tiles=16, max_chunks=48):
+        self.tiles = tiles
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.chunk_tiles = chunk_tiles
+        self.chunk_size = chunk_tiles * tile_size
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # LRU of pre-rendered chunk surfaces
+        self.pixel_width = width * tile_size
+        self.pixel_height = height * tile_size
+
+    def is_wall(self, col, row):
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return self.tiles[row * self.width + col] == 1
+        return True
+
+    def cell_center(self, col, row):
+        # Centre of maze cell (col, row) in world pixels, cells sit on odd tiles
+        return ((2 * col + 1) * self.tile_size + self.tile_size // 2,
+                (2 * row + 1) * self.tile_size + self.tile_size // 2)
+
+    def _render_chunk(self, cx, cy):
+        surface = pygame.Surface((self.chunk_size, self.chunk_size)).convert()
+        surface.fill(BLACK)
+        first_col = cx * self.chunk_tiles
+        first_row = cy * self.chunk_tiles
+        for row in range(first_row, min(first_row + self.chunk_tiles, self.height)):
+            base = row * self.width
+            for col in range(first_col, min(first_col + self.chunk_tiles, self.width)):
+                if self.tiles[base + col]:
+                    pygame.draw.rect(surface, BLUE, ((col - first_col) * self.tile_size,
+                                                     (row - first_row) * self.tile_size,
+                                                     self.tile_size, self.tile_size))
+        return surface
+
+    def get_chunk(self, cx, cy):
+        key = (cx, cy)
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self._render_chunk(cx, cy)
+            self.chunks[key] = surface
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    def draw(self, screen, camera):
+        view = camera.rect
+        first_cx = view.left // self.chunk_size
+        last_cx = min((view.right - 1) // self.chunk_size, (self.pixel_width - 1) // self.chunk_size)
+        first_cy = view.top // self.chunk_size
+        last_cy = min((view.bottom - 1) // self.chunk_size, (self.pixel_height - 1) // self.chunk_size)
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                screen.blit(self.get_chunk(cx, cy), (cx * self.chunk_size - view.x, cy * self.chunk_size - view.y))
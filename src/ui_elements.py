@@ -1,31 +1,111 @@
+from collections import deque
 import pygame
 from config import *
+from font_manager import font_manager
+from game_io import RealClock
 
 class Terminal:
-    def __init__(self, x, y, width, height):
+    def __init__(self, x, y, width, height, clock=None, scrollback=TERMINAL_SCROLLBACK):
         self.rect = pygame.Rect(x, y, width, height)
-        self.text = []
-        self.font = pygame.font.Font(None, 24)
-        self.pulse_time = pygame.time.get_ticks()  # For pulsing effect
-        
+        self.font_size = 24
+        self.padding = 15
+        self.line_height = 30
+        self.visible_lines = max(1, (height - self.padding) // self.line_height)
+        self.clock = clock or RealClock()
+        self.pulse_time = self.clock.ticks()  # For pulsing effect
+        # Wrapped lines in a ring buffer, line n (counting from the first ever added) lives at n % capacity
+        self.capacity = scrollback
+        self.lines = [None] * scrollback
+        self.total = 0
+        # Messages wait here until the next draw wraps them, levels may be built off the main thread
+        self.pending = deque(maxlen=scrollback)
+        self.scroll_offset = 0  # Lines scrolled back from the newest, 0 follows new output
+        self.line_surfaces = {}  # Line number -> rendered surface, only for lines on screen
+        self.panel = None  # Composed background and visible lines
+        self.stale = True  # Set by add_message and scroll, the panel is only recomposed then
+
     def add_message(self, message):
-        self.text.append(message)
-        if len(self.text) > 10:  # Keep only last 10 messages
-            self.text.pop(0)
-            
+        self.pending.append(message)
+        self.stale = True
+
+    def _flush(self):
+        while self.pending:
+            wrapped = self.wrap(self.pending.popleft())
+            for line in wrapped:
+                self.lines[self.total % self.capacity] = line
+                self.total += 1
+            if self.scroll_offset:
+                # Keep the scrolled-back view still while new lines arrive underneath it
+                self.scroll_offset = min(self.scroll_offset + len(wrapped), self.max_scroll())
+
+    def wrap(self, message):
+        # Split on words to fit the box, words wider than a whole line are split by character
+        font = font_manager.get_font(self.font_size)
+        width = self.rect.width - 2 * self.padding
+        wrapped = []
+        for paragraph in message.split('\n'):
+            line = ""
+            for word in paragraph.split(' '):
+                candidate = f"{line} {word}" if line else word
+                if font.size(candidate)[0] <= width:
+                    line = candidate
+                    continue
+                if line:
+                    wrapped.append(line)
+                while font.size(word)[0] > width:
+                    cut = len(word) - 1
+                    while cut > 1 and font.size(word[:cut])[0] > width:
+                        cut -= 1
+                    wrapped.append(word[:cut])
+                    word = word[cut:]
+                line = word
+            wrapped.append(line)
+        return wrapped
+
+    def line_count(self):
+        return min(self.total, self.capacity)
+
+    def max_scroll(self):
+        return max(0, self.line_count() - self.visible_lines)
+
+    def scroll(self, lines):
+        # Positive scrolls back towards older output
+        self._flush()
+        offset = max(0, min(self.max_scroll(), self.scroll_offset + lines))
+        if offset != self.scroll_offset:
+            self.scroll_offset = offset
+            self.stale = True
+
+    def _compose(self):
+        self._flush()
+        font = font_manager.get_font(self.font_size)
+        if self.panel is None or self.panel.get_size() != self.rect.size:
+            self.panel = pygame.Surface(self.rect.size).convert()
+        self.panel.fill(BLACK)
+        last = self.total - self.scroll_offset
+        first = max(self.total - self.line_count(), last - self.visible_lines)
+        surfaces = {}
+        for y, n in enumerate(range(first, last)):
+            surface = self.line_surfaces.get(n)
+            if surface is None:
+                surface = font.render(self.lines[n % self.capacity], True, GREEN)
+            surfaces[n] = surface
+            self.panel.blit(surface, (self.padding, self.padding + y * self.line_height))
+        self.line_surfaces = surfaces
+        self.stale = False
+        if self.scroll_offset:
+            marker = font_manager.render(f"[-{self.scroll_offset}]", self.font_size, WHITE)
+            self.panel.blit(marker, (self.rect.width - marker.get_width() - self.padding, self.padding))
+
     def draw(self, screen):
-        pygame.draw.rect(screen, BLACK, self.rect)
-        
+        if self.stale:
+            self._compose()
+        screen.blit(self.panel, self.rect)
+
         # Pulsing border effect
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.ticks()
         if current_time - self.pulse_time > PULSE_SPEED:
             self.pulse_time = current_time
         pulse_factor = (current_time % PULSE_SPEED) / PULSE_SPEED
         color = (0, int(255 * pulse_factor), 0)  # Fade from black to green
         pygame.draw.rect(screen, color, self.rect, 3)
-        
-        y_offset = 15
-        for message in self.text:
-            text_surface = self.font.render(message, True, GREEN)
-            screen.blit(text_surface, (self.rect.x + 15, self.rect.y + y_offset))
-            y_offset += 30
\ No newline at end of file
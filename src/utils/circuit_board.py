@@ -0,0 +1,148 @@
+from array import array
+from collections import deque
+
+# (row, col) steps matching the order of CircuitPiece.connections
+DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+def to_mask(connections):
+    mask = 0
+    for i, connected in enumerate(connections):
+        if connected:
+            mask |= 1 << i
+    return mask
+
+def rotate_mask(mask):
+    # Same shift as CircuitPiece.rotate: connections[i] takes connections[i + 1]
+    return (mask >> 1) | ((mask & 1) << 3)
+
+class CircuitBoard:
+    def __init__(self, size, masks):
+        self.size = size
+        self.masks = bytearray(masks)
+        # A piece is connected when its mark equals the current epoch, bumping the epoch clears all marks
+        self.marks = array('I', [0]) * (size * size)
+        self.epoch = 1
+        self.count = 0
+        self.recompute()
+
+    def is_connected(self, index):
+        return self.marks[index] == self.epoch
+
+    def is_complete(self):
+        return self.count == self.size * self.size
+
+    def neighbors(self, index):
+        # Pieces whose facing openings line up with this one
+        size = self.size
+        row, col = divmod(index, size)
+        mask = self.masks[index]
+        for i, (dr, dc) in enumerate(DIRECTIONS):
+            if mask & (1 << i):
+                r, c = row + dr, col + dc
+                if 0 <= r < size and 0 <= c < size:
+                    other = r * size + c
+                    if self.masks[other] & (1 << ((i + 2) % 4)):
+                        yield other
+
+    def recompute(self):
+        self.epoch += 1
+        self.count = 0
+        self._grow(0)
+        return self.count, self.is_complete()
+
+    def _grow(self, start):
+        # Iterative flood fill marking unmarked pieces reachable from start
+        epoch = self.epoch
+        marks = self.marks
+        marks[start] = epoch
+        self.count += 1
+        frontier = [start]
+        while frontier:
+            index = frontier.pop()
+            for other in self.neighbors(index):
+                if marks[other] != epoch:
+                    marks[other] = epoch
+                    self.count += 1
+                    frontier.append(other)
+
+    def _split(self, sources):
+        # Interleaved searches from every end of the removed links, restricted to connected pieces.
+        # Searches merge when they meet; returns the groups that ran out of pieces to visit, each
+        # of which is a complete component. Only the largest group is left unexplored.
+        epoch = self.epoch
+        marks = self.marks
+        parent = {}
+        owner = {}
+        groups = {}
+        for source in sources:
+            if source not in owner:
+                owner[source] = source
+                parent[source] = source
+                groups[source] = ([source], deque([source]))
+
+        def find(label):
+            while parent[label] != label:
+                parent[label] = parent[parent[label]]
+                label = parent[label]
+            return label
+
+        active = list(groups)
+        exhausted = []
+        while len(active) > 1:
+            for label in list(active):
+                if len(active) == 1:
+                    break
+                if label not in groups:
+                    continue
+                members, frontier = groups[label]
+                if not frontier:
+                    active.remove(label)
+                    exhausted.append(members)
+                    continue
+                index = frontier.popleft()
+                for other in self.neighbors(index):
+                    if marks[other] != epoch:
+                        continue
+                    if other in owner:
+                        found = find(owner[other])
+                        if found != label:
+                            found_members, found_frontier = groups.pop(found)
+                            members.extend(found_members)
+                            frontier.extend(found_frontier)
+                            parent[found] = label
+                            active.remove(found)
+                    else:
+                        owner[other] = label
+                        members.append(other)
+                        frontier.append(other)
+        return exhausted
+
+    def rotate(self, index):
+        # Only links at this piece change, so only the component they touch is revisited
+        before = set(self.neighbors(index))
+        self.masks[index] = rotate_mask(self.masks[index])
+        after = set(self.neighbors(index))
+
+        removed = [other for other in before - after if self.is_connected(other)]
+        if removed and self.is_connected(index):
+            detached = self._split([index] + removed)
+            root = next((members for members in detached if 0 in members), None)
+            if root is not None:
+                # The root kept a small side: re-mark it under a fresh epoch, dropping the rest
+                self.epoch += 1
+                for piece in root:
+                    self.marks[piece] = self.epoch
+                self.count = len(root)
+            else:
+                for members in detached:
+                    for piece in members:
+                        self.marks[piece] = 0
+                    self.count -= len(members)
+
+        if self.is_connected(index):
+            for other in after:
+                if not self.is_connected(other):
+                    self._grow(other)
+        elif any(self.is_connected(other) for other in after):
+            self._grow(index)
+        return self.count, self.is_complete()
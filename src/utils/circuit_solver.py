@@ -0,0 +1,222 @@
+import random
+from utils.circuit_board import DIRECTIONS, rotate_mask
+
+# Piece shapes as connection masks, in CircuitPiece.connections order
+PIECE_TYPES = {
+    'corner': 0b0011,
+    'straight': 0b0101,
+    'tee': 0b0111,
+    'cross': 0b1111,
+}
+
+def rotations(mask):
+    # rotations(mask)[r] is the mask after r clicks
+    masks = []
+    for _ in range(4):
+        masks.append(mask)
+        mask = rotate_mask(mask)
+    return masks
+
+def _popcount(value):
+    return bin(value).count('1')
+
+def _build_tables():
+    # For a base mask and a set of still-possible rotations (4-bit domain): openings shared by
+    # every candidate, openings of any candidate, and the domain filtered on one side
+    must = [[0] * 16 for _ in range(16)]
+    may = [[0] * 16 for _ in range(16)]
+    keep = [[[[0, 0] for _ in range(4)] for _ in range(16)] for _ in range(16)]
+    for base in range(16):
+        masks = rotations(base)
+        for domain in range(16):
+            all_open, any_open = 15, 0
+            for r in range(4):
+                if domain & (1 << r):
+                    all_open &= masks[r]
+                    any_open |= masks[r]
+            must[base][domain] = all_open if domain else 0
+            may[base][domain] = any_open
+            for direction in range(4):
+                for want in (0, 1):
+                    filtered = 0
+                    for r in range(4):
+                        if domain & (1 << r) and bool(masks[r] & (1 << direction)) == bool(want):
+                            filtered |= 1 << r
+                    keep[base][domain][direction][want] = filtered
+    return must, may, keep
+
+MUST_OPEN, MAY_OPEN, KEEP = _build_tables()
+
+class Solution:
+    def __init__(self, clicks, guesses):
+        self.clicks = clicks  # Rotations each piece needs from its current state
+        self.guesses = guesses
+        # Effort score: every click a player must make, plus ten per branch the solver had to guess
+        self.difficulty = sum(clicks) + 10 * guesses
+
+def _propagate(size, base, domains, queue):
+    while queue:
+        index = queue.pop()
+        row, col = divmod(index, size)
+        domain = domains[index]
+        must = MUST_OPEN[base[index]][domain]
+        may = MAY_OPEN[base[index]][domain]
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            r, c = row + dr, col + dc
+            if not (0 <= r < size and 0 <= c < size):
+                continue
+            bit = 1 << direction
+            if must & bit:
+                want = 1
+            elif not may & bit:
+                want = 0
+            else:
+                continue
+            other = r * size + c
+            current = domains[other]
+            filtered = KEEP[base[other]][current][(direction + 2) % 4][want]
+            if filtered != current:
+                if not filtered:
+                    return False
+                domains[other] = filtered
+                queue.append(other)
+    return True
+
+def _inspect(size, base, domains):
+    # Returns ('dead', None), ('solved', None) or ('branch', index of the most constrained piece)
+    total = size * size
+    seen = bytearray(total)
+    branch = None
+    branch_count = 5
+    for start in range(total):
+        if seen[start]:
+            continue
+        seen[start] = 1
+        component = [start]
+        decided = True
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            count = _popcount(domains[index])
+            if count > 1:
+                decided = False
+                if count < branch_count:
+                    branch, branch_count = index, count
+            row, col = divmod(index, size)
+            must = MUST_OPEN[base[index]][domains[index]]
+            for direction, (dr, dc) in enumerate(DIRECTIONS):
+                if must & (1 << direction):
+                    other = (row + dr) * size + col + dc
+                    if not seen[other]:
+                        seen[other] = 1
+                        component.append(other)
+                        stack.append(other)
+        # A fully decided group of pieces can never link to anything else
+        if decided and len(component) < total:
+            return 'dead', None
+    if branch is None:
+        return 'solved', None
+    return 'branch', branch
+
+def solve(size, masks, max_nodes=20000):
+    # Rotations that link every piece to (0, 0) with no opening left dangling, or None
+    base = bytes(masks)
+    domains = bytearray(size * size)
+    for index, mask in enumerate(base):
+        options = rotations(mask)
+        domain = 0
+        for r, rotated in enumerate(options):
+            if rotated not in options[:r]:
+                domain |= 1 << r
+        row, col = divmod(index, size)
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            if not (0 <= row + dr < size and 0 <= col + dc < size):
+                domain = KEEP[mask][domain][direction][0]
+        if not domain:
+            return None
+        domains[index] = domain
+    if not _propagate(size, base, domains, list(range(size * size))):
+        return None
+
+    stack = [domains]
+    nodes = 0
+    while stack and nodes < max_nodes:
+        domains = stack.pop()
+        nodes += 1
+        state, index = _inspect(size, base, domains)
+        if state == 'dead':
+            continue
+        if state == 'solved':
+            clicks = [domain.bit_length() - 1 for domain in domains]
+            return Solution(clicks, nodes - 1)
+        for r in range(4):
+            if domains[index] & (1 << r):
+                child = bytearray(domains)
+                child[index] = 1 << r
+                if _propagate(size, base, child, [index]):
+                    stack.append(child)
+    return None
+
+def _spanning_tree(size, rng):
+    # Randomised Kruskal over the grid, returns connection masks of the tree
+    parent = list(range(size * size))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    edges = []
+    for row in range(size):
+        for col in range(size):
+            index = row * size + col
+            if col + 1 < size:
+                edges.append((index, index + 1, 2))
+            if row + 1 < size:
+                edges.append((index, index + size, 1))
+    rng.shuffle(edges)
+
+    masks = [0] * (size * size)
+    for a, b, direction in edges:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+            masks[a] |= 1 << direction
+            masks[b] |= 1 << ((direction + 2) % 4)
+    return masks
+
+def _neighbor_directions(size, index):
+    row, col = divmod(index, size)
+    return [d for d, (dr, dc) in enumerate(DIRECTIONS) if 0 <= row + dr < size and 0 <= col + dc < size]
+
+def generate_board(size, rng=None, attempts=20):
+    # Returns (masks, solution): scrambled piece masks that are solvable by construction, verified by solve()
+    rng = rng or random
+    if size == 1:
+        # A lone piece is trivially linked to itself
+        return [PIECE_TYPES['corner']], Solution([0], 0)
+    for _ in range(attempts):
+        masks = _spanning_tree(size, rng)
+        # No piece has a single opening, so give every leaf of the tree a second link
+        for index in range(size * size):
+            if _popcount(masks[index]) == 1:
+                options = [d for d in _neighbor_directions(size, index) if not masks[index] & (1 << d)]
+                direction = rng.choice(options)
+                row, col = divmod(index, size)
+                dr, dc = DIRECTIONS[direction]
+                masks[index] |= 1 << direction
+                masks[(row + dr) * size + col + dc] |= 1 << ((direction + 2) % 4)
+
+        # Scramble every piece except the yellow start piece, which stays linked right and down
+        scrambled = []
+        clicks = []
+        for index, mask in enumerate(masks):
+            turns = 0 if index == 0 else rng.randrange(4)
+            scrambled.append(rotations(mask)[turns])
+            clicks.append(-turns % 4)
+        solution = solve(size, scrambled)
+        if solution is not None:
+            return scrambled, solution
+    # The solver ran out of budget, fall back to the rotations the board was scrambled with
+    return scrambled, Solution(clicks, attempts)
@@ -0,0 +1,77 @@
+import random
+from config import MAZE_WORLD_SIZE, MAZE_TILE_SIZE, MAZE_AI_COUNT, WINDOW_WIDTH, WINDOW_HEIGHT, FIREWALL_ENDLESS
+from utils.circuit_solver import generate_board
+from utils.maze_generator import generate_maze, merge_wall_tiles, patrol_route
+
+# Level content as plain picklable data, built from a seed so worker processes can make it ahead of time
+# and recordings can rebuild it. Nothing here may import pygame.
+
+def firewall_spec(difficulty, seed, endless=FIREWALL_ENDLESS):
+    # Patterns are windows on utils.pattern_stream.PatternStream(seed), nothing to build ahead of time
+    return {'seed': seed, 'endless': endless}
+
+def circuit_spec(difficulty, seed, grid_size=4):
+    masks, solution = generate_board(grid_size, random.Random(seed))
+    return {'seed': seed, 'grid_size': grid_size, 'masks': masks, 'clicks': solution.clicks, 'guesses': solution.guesses}
+
+def showdown_spec(difficulty, seed, maze_size=MAZE_WORLD_SIZE, ai_count=MAZE_AI_COUNT):
+    # Walls as (x, y, w, h) and AI patrol routes as lists of top-left points, in world pixels
+    if not maze_size:
+        return {
+            'seed': seed,
+            'maze_size': None,
+            'tiles': None,
+            'world_size': (WINDOW_WIDTH, WINDOW_HEIGHT),
+            'walls': [
+                (200, 100, 20, 400),
+                (400, 100, 20, 300),
+                (600, 200, 20, 400),
+                (100, 200, 200, 20),
+                (300, 300, 200, 20),
+                (500, 400, 200, 20),
+                (100, 500, 400, 20),
+                (300, 150, 100, 20)
+            ],
+            'routes': [
+                [(WINDOW_WIDTH - 100, WINDOW_HEIGHT - 100), (WINDOW_WIDTH - 100, 100),
+                 (100, 100), (100, WINDOW_HEIGHT - 100)],
+                [(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2), (WINDOW_WIDTH // 2, 50),
+                 (50, WINDOW_HEIGHT // 2), (WINDOW_WIDTH - 50, WINDOW_HEIGHT - 50)]
+            ],
+            'start': (50, 50),
+            'switch': (WINDOW_WIDTH - 80, 50, 30, 30)
+        }
+
+    cols, rows = maze_size
+    rng = random.Random(seed)
+    tiles, width, height = generate_maze(cols, rows, seed)
+
+    def cell_center(col, row):
+        return ((2 * col + 1) * MAZE_TILE_SIZE + MAZE_TILE_SIZE // 2,
+                (2 * row + 1) * MAZE_TILE_SIZE + MAZE_TILE_SIZE // 2)
+
+    routes = []
+    for _ in range(ai_count):
+        col, row = rng.randrange(cols), rng.randrange(rows)
+        if col + row < 4:  # Keep the spawn area clear
+            col, row = cols - 1 - col, rows - 1 - row
+        route = []
+        for cell in patrol_route(tiles, width, col, row, 6, rng):
+            cx, cy = cell_center(*cell)
+            route.append((cx - 10, cy - 10))
+        routes.append(route)
+
+    x, y = cell_center(0, 0)
+    start = (x - 10, y - 10)
+    x, y = cell_center(cols - 1, rows - 1)
+    return {
+        'seed': seed,
+        'maze_size': (cols, rows),
+        'tiles': bytes(tiles),
+        'tile_grid': (width, height),
+        'world_size': (width * MAZE_TILE_SIZE, height * MAZE_TILE_SIZE),
+        'walls': merge_wall_tiles(tiles, width, height, MAZE_TILE_SIZE),
+        'routes': routes,
+        'start': start,
+        'switch': (x - 15, y - 15, 30, 30)
+    }
@@ -0,0 +1,76 @@
+import random
+
+def generate_maze(cols, rows, seed=None):
+    # Iterative recursive-backtracker over a (2*cols+1) x (2*rows+1) tile grid, 1 = wall
+    rng = random.Random(seed)
+    width = 2 * cols + 1
+    height = 2 * rows + 1
+    tiles = bytearray(b'\x01' * (width * height))
+    visited = bytearray(cols * rows)
+
+    stack = [(0, 0)]
+    visited[0] = 1
+    tiles[width + 1] = 0
+    directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    while stack:
+        col, row = stack[-1]
+        options = []
+        for dc, dr in directions:
+            nc, nr = col + dc, row + dr
+            if 0 <= nc < cols and 0 <= nr < rows and not visited[nr * cols + nc]:
+                options.append((nc, nr, dc, dr))
+        if not options:
+            stack.pop()
+            continue
+        nc, nr, dc, dr = options[rng.randrange(len(options))]
+        visited[nr * cols + nc] = 1
+        tiles[(2 * row + 1 + dr) * width + 2 * col + 1 + dc] = 0
+        tiles[(2 * nr + 1) * width + 2 * nc + 1] = 0
+        stack.append((nc, nr))
+    return tiles, width, height
+
+def merge_wall_tiles(tiles, width, height, tile_size):
+    # Greedy merge of wall tiles into rectangles: horizontal runs, extended downwards while identical
+    rects = []
+    open_runs = {}
+    for row in range(height):
+        runs = {}
+        col = 0
+        base = row * width
+        while col < width:
+            if tiles[base + col]:
+                start = col
+                while col < width and tiles[base + col]:
+                    col += 1
+                runs[(start, col)] = None
+            else:
+                col += 1
+        for span, rect in open_runs.items():
+            if span in runs:
+                rect[3] += 1
+                runs[span] = rect
+            else:
+                rects.append(rect)
+        for span, rect in runs.items():
+            if rect is None:
+                runs[span] = [span[0], row, span[1] - span[0], 1]
+        open_runs = runs
+    rects.extend(open_runs.values())
+    return [(x * tile_size, y * tile_size, w * tile_size, h * tile_size) for x, y, w, h in rects]
+
+def patrol_route(tiles, width, start_col, start_row, steps, rng):
+    # Walk open corridors from a maze cell; consecutive points are always in a straight corridor
+    route = [(start_col, start_row)]
+    previous = None
+    col, row = start_col, start_row
+    for _ in range(steps):
+        options = []
+        for dc, dr in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            if not tiles[(2 * row + 1 + dr) * width + 2 * col + 1 + dc] and (col + dc, row + dr) != previous:
+                options.append((col + dc, row + dr))
+        if not options:
+            break
+        previous = (col, row)
+        col, row = options[rng.randrange(len(options))]
+        route.append((col, row))
+    return route + route[-2:0:-1]
@@ -0,0 +1,113 @@
+from array import array
+from collections import OrderedDict, deque
+
+class NavGrid:
+    def __init__(self, walls, width, height, cell_size=20, flow_radius=60, max_paths=256):
+        self.cell_size = cell_size
+        self.cols = -(-width // cell_size)
+        self.rows = -(-height // cell_size)
+        self.flow_radius = flow_radius
+        self.blocked = bytearray(self.cols * self.rows)
+        for wall in walls:
+            for row in range(max(0, wall.top // cell_size), min(self.rows, (wall.bottom - 1) // cell_size + 1)):
+                base = row * self.cols
+                for col in range(max(0, wall.left // cell_size), min(self.cols, (wall.right - 1) // cell_size + 1)):
+                    self.blocked[base + col] = 1
+
+        # Flow field: for every reached cell, the next cell index on a shortest path to the target
+        self.flow = array('i', [-1]) * (self.cols * self.rows)
+        self.flow_target = None
+        self.flow_touched = []
+        self.path_cache = OrderedDict()  # LRU of paths by (start cell, goal cell)
+        self.max_paths = max_paths
+
+    def cell_of(self, x, y):
+        col = min(max(int(x) // self.cell_size, 0), self.cols - 1)
+        row = min(max(int(y) // self.cell_size, 0), self.rows - 1)
+        return col, row
+
+    def cell_center(self, index):
+        row, col = divmod(index, self.cols)
+        return (col * self.cell_size + self.cell_size // 2, row * self.cell_size + self.cell_size // 2)
+
+    def _neighbors(self, index):
+        row, col = divmod(index, self.cols)
+        if col > 0:
+            yield index - 1
+        if col < self.cols - 1:
+            yield index + 1
+        if row > 0:
+            yield index - self.cols
+        if row < self.rows - 1:
+            yield index + self.cols
+
+    def update_flow(self, target_cell):
+        # Recomputed only when the target moves to a different cell
+        if target_cell == self.flow_target:
+            return
+        self.flow_target = target_cell
+        flow = self.flow
+        for index in self.flow_touched:
+            flow[index] = -1
+        target = target_cell[1] * self.cols + target_cell[0]
+        if self.blocked[target]:
+            self.flow_touched = []
+            return
+
+        flow[target] = target
+        touched = [target]
+        frontier = deque([(target, 0)])
+        blocked = self.blocked
+        while frontier:
+            index, distance = frontier.popleft()
+            if distance >= self.flow_radius:
+                continue
+            for neighbor in self._neighbors(index):
+                if flow[neighbor] == -1 and not blocked[neighbor]:
+                    flow[neighbor] = index
+                    touched.append(neighbor)
+                    frontier.append((neighbor, distance + 1))
+        self.flow_touched = touched
+
+    def next_waypoint(self, x, y):
+        # O(1) lookup into the current flow field, None when the cell was not reached
+        col, row = self.cell_of(x, y)
+        current = row * self.cols + col
+        index = self.flow[current]
+        if index == -1 or index == current:
+            return None
+        return self.cell_center(index)
+
+    def find_path(self, start, goal):
+        # Shortest path between two pixel positions as a tuple of cell centres, cached per cell pair
+        start_col, start_row = self.cell_of(*start)
+        goal_col, goal_row = self.cell_of(*goal)
+        key = (start_row * self.cols + start_col, goal_row * self.cols + goal_col)
+        if key in self.path_cache:
+            self.path_cache.move_to_end(key)
+            return self.path_cache[key]
+
+        source, target = key
+        parents = {source: source}
+        frontier = deque([source])
+        while frontier:
+            index = frontier.popleft()
+            if index == target:
+                break
+            for neighbor in self._neighbors(index):
+                if neighbor not in parents and not self.blocked[neighbor]:
+                    parents[neighbor] = index
+                    frontier.append(neighbor)
+
+        path = None
+        if target in parents:
+            path = []
+            index = target
+            while index != source:
+                path.append(self.cell_center(index))
+                index = parents[index]
+            path = tuple(reversed(path))
+        self.path_cache[key] = path
+        if len(self.path_cache) > self.max_paths:
+            self.path_cache.popitem(last=False)
+        return path
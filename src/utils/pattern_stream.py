@@ -0,0 +1,36 @@
+MASK64 = (1 << 64) - 1
+
+def _mix(value):
+    # SplitMix64 finaliser, consecutive inputs give independent looking outputs
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK64
+    return value ^ (value >> 31)
+
+class PatternStream:
+    # Endless button sequence from a seed. Symbols are computed from their index, nothing is stored,
+    # so a pattern of any length is just a (start, length) window
+    def __init__(self, seed, symbols=4):
+        self.key = _mix(seed & MASK64)
+        self.symbols = symbols
+
+    def symbol(self, index):
+        return (_mix((self.key + index * 0x9E3779B97F4A7C15) & MASK64) >> 32) % self.symbols
+
+    def window(self, start, length):
+        for index in range(start, start + length):
+            yield self.symbol(index)
+
+class PlaybackTimeline:
+    # Symbol k of a pattern lights up at start + (k + 1) * interval and stays lit for one interval,
+    # the player's turn begins when the last one goes out
+    def __init__(self, start, length, interval):
+        self.start = start
+        self.length = length
+        self.interval = interval
+
+    def index_at(self, now):
+        # Symbols shown so far, the one lit is this minus one
+        return max(0, min(self.length, (now - self.start) // self.interval))
+
+    def finished(self, now):
+        return now - self.start >= (self.length + 1) * self.interval
@@ -0,0 +1,59 @@
+import pygame
+
+class SpatialHash:
+    def __init__(self, rects, cell_size=64):
+        self.cell_size = cell_size
+        self.rects = [pygame.Rect(rect) for rect in rects]
+        self.cells = {}
+        for i, rect in enumerate(self.rects):
+            for cell in self._cells_for(rect):
+                self.cells.setdefault(cell, []).append(i)
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield cx, cy
+
+    def query(self, rect):
+        # Walls sharing a cell with rect, each returned once
+        seen = set()
+        nearby = []
+        for cell in self._cells_for(rect):
+            for i in self.cells.get(cell, ()):
+                if i not in seen:
+                    seen.add(i)
+                    nearby.append(self.rects[i])
+        return nearby
+
+    def collides(self, rect):
+        for cell in self._cells_for(rect):
+            for i in self.cells.get(cell, ()):
+                if rect.colliderect(self.rects[i]):
+                    return True
+        return False
+
+    def move(self, rect, dx, dy):
+        # Resolve each axis separately so entities slide along walls instead of stopping dead
+        if dx:
+            original = rect.copy()
+            rect.x += dx
+            for wall in self.query(rect):
+                if rect.colliderect(wall):
+                    if original.colliderect(wall):
+                        rect.x = original.x
+                    elif dx > 0:
+                        rect.right = wall.left
+                    else:
+                        rect.left = wall.right
+        if dy:
+            original = rect.copy()
+            rect.y += dy
+            for wall in self.query(rect):
+                if rect.colliderect(wall):
+                    if original.colliderect(wall):
+                        rect.y = original.y
+                    elif dy > 0:
+                        rect.bottom = wall.top
+                    else:
+                        rect.top = wall.bottom
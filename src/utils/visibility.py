@@ -0,0 +1,148 @@
+import os
+import math
+import struct
+import hashlib
+from config import VISIBILITY_CACHE_ENTRIES
+
+try:
+    import numpy as np
+except ImportError:  # Without numpy the table is filled lazily and not cached to disk
+    np = None
+
+class VisibilityTable:
+    def __init__(self, nav, view_distance, cache_dir=None, cache_entries=VISIBILITY_CACHE_ENTRIES):
+        self.nav = nav
+        self.radius = max(1, math.ceil(view_distance / nav.cell_size))
+        self.cells = nav.cols * nav.rows
+
+        # Every cell offset within the view radius, with the cells a ray to it passes through
+        self.offsets = []
+        self.samples = []
+        self.offset_index = {}
+        for dy in range(-self.radius, self.radius + 1):
+            for dx in range(-self.radius, self.radius + 1):
+                if dx * dx + dy * dy <= self.radius * self.radius:
+                    self.offset_index[(dx, dy)] = len(self.offsets)
+                    self.offsets.append((dx, dy))
+                    self.samples.append(self._ray_cells(dx, dy))
+
+        self.key = self._maze_hash()
+        self.table = None
+        self.lazy = {}
+        if np is not None:
+            size = 2 * self.radius + 1
+            self.offset_lookup = np.full((size, size), -1, dtype=np.int64)
+            for (dx, dy), t in self.offset_index.items():
+                self.offset_lookup[dy + self.radius, dx + self.radius] = t
+            self.table = self._load(cache_dir) if cache_dir else None
+            if self.table is None:
+                self.table = self._build()
+                if cache_dir:
+                    self._save(cache_dir)
+                    self._prune(cache_dir, cache_entries)
+
+    def _ray_cells(self, dx, dy):
+        steps = 2 * max(abs(dx), abs(dy))
+        cells = []
+        for k in range(1, steps):
+            cell = (math.floor(dx * k / steps + 0.5), math.floor(dy * k / steps + 0.5))
+            if cell != (0, 0) and cell != (dx, dy) and cell not in cells:
+                cells.append(cell)
+        return cells
+
+    def _maze_hash(self):
+        nav = self.nav
+        digest = hashlib.sha1(struct.pack('<4I', nav.cols, nav.rows, nav.cell_size, self.radius))
+        digest.update(bytes(nav.blocked))
+        return digest.hexdigest()
+
+    def _cache_path(self, cache_dir):
+        return os.path.join(cache_dir, f"visibility_{self.key}.npy")
+
+    def _load(self, cache_dir):
+        try:
+            packed = np.load(self._cache_path(cache_dir))
+        except (OSError, ValueError):
+            return None
+        if packed.shape[0] != self.cells:
+            return None
+        try:
+            os.utime(self._cache_path(cache_dir))  # Keeps tables still in use out of _prune's way
+        except OSError:
+            pass
+        return np.unpackbits(packed, axis=1, count=len(self.offsets)).astype(bool)
+
+    def _save(self, cache_dir):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            path = self._cache_path(cache_dir)
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                np.save(f, np.packbits(self.table, axis=1))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not cache visibility table: {e}")
+
+    def _prune(self, cache_dir, keep):
+        # Only the most recently used tables stay, a fresh procedural layout would otherwise add one per level
+        try:
+            paths = [entry.path for entry in os.scandir(cache_dir)
+                     if entry.name.startswith('visibility_') and entry.name.endswith('.npy')]
+            paths.sort(key=os.path.getmtime, reverse=True)
+            for path in paths[keep:]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not prune visibility cache: {e}")
+
+    def _build(self):
+        nav = self.nav
+        blocked = np.frombuffer(bytes(nav.blocked), dtype=np.uint8).astype(bool)
+        cols = np.arange(self.cells) % nav.cols
+        rows = np.arange(self.cells) // nav.cols
+        table = np.zeros((self.cells, len(self.offsets)), dtype=bool)
+        for t, ((dx, dy), cells) in enumerate(zip(self.offsets, self.samples)):
+            visible = (cols + dx >= 0) & (cols + dx < nav.cols) & (rows + dy >= 0) & (rows + dy < nav.rows)
+            for ox, oy in cells:
+                c = cols + ox
+                r = rows + oy
+                inside = (c >= 0) & (c < nav.cols) & (r >= 0) & (r < nav.rows)
+                index = np.where(inside, r * nav.cols + c, 0)
+                visible &= inside & ~blocked[index]
+            table[:, t] = visible
+        return table
+
+    def _trace(self, source, t):
+        nav = self.nav
+        row, col = divmod(source, nav.cols)
+        for ox, oy in self.samples[t]:
+            c, r = col + ox, row + oy
+            if not (0 <= c < nav.cols and 0 <= r < nav.rows) or nav.blocked[r * nav.cols + c]:
+                return False
+        return True
+
+    def line_of_sight(self, start, end):
+        # A table lookup replaces the raycast, cells beyond the view radius are never visible
+        col, row = self.nav.cell_of(*start)
+        end_col, end_row = self.nav.cell_of(*end)
+        t = self.offset_index.get((end_col - col, end_row - row))
+        if t is None:
+            return False
+        source = row * self.nav.cols + col
+        if self.table is not None:
+            return bool(self.table[source, t])
+        key = source * len(self.offsets) + t
+        if key not in self.lazy:
+            self.lazy[key] = self._trace(source, t)
+        return self.lazy[key]
+
+    def line_of_sight_batch(self, starts, end):
+        # Vectorised form for the swarm engine: starts is an (n, 2) array of pixel positions
+        nav = self.nav
+        cols = np.clip(starts[:, 0] // nav.cell_size, 0, nav.cols - 1).astype(np.int64)
+        rows = np.clip(starts[:, 1] // nav.cell_size, 0, nav.rows - 1).astype(np.int64)
+        end_col, end_row = nav.cell_of(*end)
+        dx = end_col - cols
+        dy = end_row - rows
+        in_range = dx * dx + dy * dy <= self.radius * self.radius
+        t = self.offset_lookup[np.clip(dy + self.radius, 0, 2 * self.radius), np.clip(dx + self.radius, 0, 2 * self.radius)]
+        return in_range & (t >= 0) & self.table[rows * nav.cols + cols, np.maximum(t, 0)]